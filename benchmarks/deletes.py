@@ -0,0 +1,88 @@
+"""Compare load-then-delete with a single DELETE ... RETURNING for books.
+
+Seeds a throwaway ``madr_benchmark`` schema in DATABASE_URL, deletes
+books one request-sized transaction at a time with each strategy, and
+reports throughput and latency percentiles.
+
+    python benchmarks/deletes.py [deletes]
+"""
+
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, delete, select, text
+from sqlalchemy.orm import Session
+
+from madr.models import Book, table_registry
+from madr.settings import Settings
+
+SCHEMA = 'madr_benchmark'
+
+
+def seed(connection, rows):
+    connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+    connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+    connection.execute(
+        text('CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public')
+    )
+    table_registry.metadata.create_all(connection)
+    connection.execute(text("INSERT INTO novelists (name) VALUES ('bench')"))
+    connection.execute(
+        text(
+            'INSERT INTO books (year, title, novelist_id) '
+            "SELECT 2000, 'book ' || n, 1 FROM generate_series(1, :rows) n"
+        ),
+        {'rows': rows},
+    )
+    connection.execute(text('ANALYZE books'))
+
+
+def load_and_delete(session, book_id):
+    book = session.scalar(select(Book).where(Book.id == book_id))
+    session.delete(book)
+    session.commit()
+
+
+def delete_returning(session, book_id):
+    session.scalar(delete(Book).where(Book.id == book_id).returning(Book.id))
+    session.commit()
+
+
+def measure(engine, strategy, ids):
+    timings = []
+
+    with Session(engine) as session:
+        for book_id in ids:
+            start = time.perf_counter()
+            strategy(session, book_id)
+            timings.append(time.perf_counter() - start)
+
+    p99 = statistics.quantiles(timings, n=100)[98]
+    return len(ids) / sum(timings), p99 * 1000
+
+
+def main(deletes):
+    engine = create_engine(
+        Settings().DATABASE_URL,
+        connect_args={'options': f'-c search_path={SCHEMA},public'},
+    )
+
+    with engine.begin() as connection:
+        seed(connection, deletes * 2)
+
+    before = measure(engine, load_and_delete, range(1, deletes + 1))
+    after = measure(
+        engine, delete_returning, range(deletes + 1, deletes * 2 + 1)
+    )
+
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+
+    print(f'deletes: {deletes} per strategy')
+    print(f'load and delete:  {before[0]:8.0f} ops/s  p99 {before[1]:6.2f} ms')
+    print(f'delete returning: {after[0]:8.0f} ops/s  p99 {after[1]:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
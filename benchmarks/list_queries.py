@@ -0,0 +1,125 @@
+"""Compare mapped-instance and column-only list queries for books.
+
+Seeds a throwaway ``madr_benchmark`` schema in DATABASE_URL and runs the
+``read_books`` page query both ways: loading ``Book`` instances through
+the session (the old path) and selecting only the ``BookPublic`` columns
+with ``madr.queries.fetch_rows``. Each page is serialized with the same
+type adapter. Reports the median time per request and the median peak
+of memory allocated while serving it, measured with tracemalloc in a
+separate pass.
+
+    python benchmarks/list_queries.py [rows]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from madr.models import Book, table_registry
+from madr.queries import fetch_rows, public_columns
+from madr.responses import json_response
+from madr.routers.books import book_page
+from madr.schemas import BookPublic
+from madr.settings import Settings
+
+SCHEMA = 'madr_benchmark'
+PAGE_SIZES = (20, 200, 2000)
+RUNS = 50
+
+
+def seed(url, rows):
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+        connection.execute(
+            text('CREATE EXTENSION IF NOT EXISTS pg_trgm SCHEMA public')
+        )
+        connection.execute(text(f'SET search_path TO {SCHEMA}, public'))
+        table_registry.metadata.create_all(connection)
+        connection.execute(
+            text("INSERT INTO novelists (name) VALUES ('bench')")
+        )
+        connection.execute(
+            text(
+                'INSERT INTO books (year, title, novelist_id) '
+                "SELECT 2000, 'book ' || n, 1 "
+                'FROM generate_series(1, :rows) n'
+            ),
+            {'rows': rows},
+        )
+    return engine
+
+
+async def mapped_page(session, limit):
+    books = (
+        await session.scalars(select(Book).order_by(Book.id).limit(limit))
+    ).all()
+    return json_response(book_page, {'books': books, 'next_cursor': None})
+
+
+async def column_page(session, limit):
+    books = await fetch_rows(
+        session,
+        select(*public_columns(Book, BookPublic), Book.updated_at)
+        .order_by(Book.id)
+        .limit(limit),
+    )
+    return json_response(book_page, {'books': books, 'next_cursor': None})
+
+
+async def measure(engine, page, limit):
+    timings, peaks = [], []
+
+    for _ in range(RUNS):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            await page(session, limit)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    for _ in range(RUNS):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await session.connection()
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await page(session, limit)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    return statistics.median(timings), statistics.median(peaks) / 1024
+
+
+async def run(url):
+    engine = create_async_engine(
+        url, connect_args={'options': f'-csearch_path={SCHEMA},public'}
+    )
+
+    print(f'median of {RUNS} requests')
+    print(f'{"rows":>6} {"path":>8} {"ms":>9} {"peak KiB":>9}')
+    for limit in PAGE_SIZES:
+        for name, page in (('mapped', mapped_page), ('columns', column_page)):
+            elapsed, peak = await measure(engine, page, limit)
+            print(f'{limit:>6} {name:>8} {elapsed:>9.2f} {peak:>9.1f}')
+
+    await engine.dispose()
+
+
+def main(rows):
+    url = Settings().DATABASE_URL
+    seed_engine = seed(url, rows)
+
+    try:
+        asyncio.run(run(url))
+    finally:
+        with seed_engine.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,91 @@
+"""Compare FastAPI's default list serialization with the adapter path.
+
+Builds in-memory ``Book`` instances and times turning a ``BookList``
+payload into response bytes, once through FastAPI's ``response_model``
+handling (validate, ``jsonable_encoder``, stdlib ``json``) and once
+through ``madr.responses.json_response`` fed with either mapped
+instances or plain row tuples. No database is needed.
+
+    python benchmarks/list_serialization.py
+"""
+
+import asyncio
+import json
+import statistics
+import time
+from collections import namedtuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from madr.models import Book
+from madr.responses import json_response
+from madr.routers.books import book_page
+from madr.schemas import BookList
+
+SIZES = (20, 200, 2000)
+RUNS = 200
+Row = namedtuple('Row', ['id', 'year', 'title', 'novelist_id'])
+
+
+def make_rows(books):
+    return [
+        Row(book.id, book.year, book.title, book.novelist_id) for book in books
+    ]
+
+
+def make_books(rows):
+    books = []
+    for n in range(1, rows + 1):
+        book = Book(year=1900 + n % 125, title=f'book {n}', novelist_id=1)
+        book.id = n
+        books.append(book)
+    return books
+
+
+async def fastapi_path(field, payload):
+    content = await serialize_response(field=field, response_content=payload)
+    return JSONResponse(content).body
+
+
+async def adapter_path(payload):
+    return json_response(book_page, payload).body
+
+
+async def measure(func, *args):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        await func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def main():
+    field = create_response_field('response', BookList)
+
+    print(f'median of {RUNS} runs, ms')
+    print(
+        f'{"rows":>6} {"fastapi":>10} {"adapter":>10} '
+        f'{"adapter, row tuples":>20}'
+    )
+    for rows in SIZES:
+        books = make_books(rows)
+        payload = {'books': books, 'next_cursor': None}
+        row_payload = {'books': make_rows(books), 'next_cursor': None}
+        assert json.loads(await fastapi_path(field, payload)) == json.loads(
+            await adapter_path(row_payload)
+        )
+
+        default = await measure(fastapi_path, field, payload)
+        adapter = await measure(adapter_path, payload)
+        adapter_rows = await measure(adapter_path, row_payload)
+        print(
+            f'{rows:>6} {default:>10.3f} {adapter:>10.3f} '
+            f'{adapter_rows:>20.3f}'
+        )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Compare substring title search with and without the trigram index.
+
+Seeds a throwaway ``madr_benchmark`` schema in DATABASE_URL, times the
+``read_books`` title query before and after creating the index, and
+drops the schema again.
+
+    python benchmarks/trigram_search.py [rows]
+"""
+
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, select, text
+
+from madr.models import Book, table_registry
+from madr.settings import Settings
+from madr.utils import sanitize
+
+SCHEMA = 'madr_benchmark'
+RUNS = 20
+
+
+def seed(connection, rows):
+    connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+    connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+    connection.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+    connection.execute(text(f'SET search_path TO {SCHEMA}, public'))
+    table_registry.metadata.create_all(connection)
+    connection.execute(text("INSERT INTO novelists (name) VALUES ('bench')"))
+    connection.execute(
+        text(
+            'INSERT INTO books (year, title, novelist_id) '
+            "SELECT 1900 + n % 125, md5(n::text) || ' ' || "
+            'md5((n * 7)::text), 1 FROM generate_series(1, :rows) AS n'
+        ),
+        {'rows': rows},
+    )
+
+
+def measure(connection, query, plan_cache_mode):
+    connection.execute(text(f'SET LOCAL plan_cache_mode = {plan_cache_mode}'))
+    connection.execute(text('DISCARD PLANS'))
+    timings = []
+
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        connection.execute(query).all()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(timings)
+
+
+def main(rows):
+    engine = create_engine(Settings().DATABASE_URL)
+    title = sanitize('c4ca4238a0b923820dcc')
+    query = (
+        select(Book)
+        .filter(Book.title.ilike(f'%{title}%'))
+        .order_by(Book.id)
+        .limit(20)
+    )
+    results = {}
+
+    with engine.begin() as connection:
+        seed(connection, rows)
+        connection.execute(text('DROP INDEX ix_books_title_trgm'))
+        connection.execute(text('ANALYZE books'))
+        results['without index'] = measure(
+            connection, query, 'force_custom_plan'
+        )
+
+        connection.execute(
+            text(
+                'CREATE INDEX ix_books_title_trgm ON books '
+                'USING gin (title gin_trgm_ops)'
+            )
+        )
+        connection.execute(text('ANALYZE books'))
+        results['with index, cached generic plan'] = measure(
+            connection, query, 'auto'
+        )
+        results['with index, custom plan'] = measure(
+            connection, query, 'force_custom_plan'
+        )
+
+        connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+
+    print(f'rows: {rows}, search: {title!r}, median of {RUNS} runs')
+    for name, median in results.items():
+        print(f'{name:32} {median:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
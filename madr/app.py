@@ -1,18 +1,39 @@
+import asyncio
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
 from fastapi import FastAPI
 
-from madr.routers import auth, books, novelists, users
+from madr.database import replicas, settings
+from madr.routers import auth, books, metrics, novelists, stats, users
 from madr.schemas import Message
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor = None
+
+    if replicas.engines:
+        monitor = asyncio.create_task(
+            replicas.monitor(settings.DATABASE_REPLICA_CHECK_INTERVAL)
+        )
+
+    yield
+
+    if monitor:
+        monitor.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(auth.router)
 app.include_router(books.router)
 app.include_router(users.router)
 app.include_router(novelists.router)
+app.include_router(stats.router)
+app.include_router(metrics.router)
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
-def read_root():
+async def read_root():
     return {'message': 'Hello, World!'}
@@ -0,0 +1,238 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_where(self, predicate):
+        with self._lock:
+            stale = [
+                key
+                for key, (_, value) in self._entries.items()
+                if predicate(value)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def values(self):
+        with self._lock:
+            return [value for _, value in self._entries.values()]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+class CacheBackendError(Exception):
+    pass
+
+
+FENCED_SET = """
+local current = redis.call('GET', KEYS[1])
+if current and tonumber(string.match(current, '^%d+'))
+        > tonumber(string.match(ARGV[1], '^%d+')) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+return 1
+"""
+
+
+def _fence(entry: bytes):
+    return int(entry.partition(b'\n')[0])
+
+
+def _payload(entry: bytes):
+    return entry.partition(b'\n')[2]
+
+
+class MemoryBackend:
+    name = 'memory'
+
+    def __init__(self, maxsize: int):
+        self._cache = TTLCache(maxsize)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, value: bytes, ttl: float):
+        current = self._cache.get(key)
+        if current is not None and _fence(current) > _fence(value):
+            return
+        self._cache.set(key, value, expires_at=time.time() + ttl)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+
+    async def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        records = [value for value in self._cache.values() if _payload(value)]
+        return {
+            'size': len(records),
+            'bytes': sum(len(value) for value in records),
+        }
+
+
+class RedisBackend:
+    name = 'redis'
+
+    def __init__(self, url: str, prefix: str = 'madr:'):
+        try:
+            from redis import asyncio as redis  # noqa: PLC0415
+        except ImportError as error:
+            raise RuntimeError(
+                'RECORD_CACHE_URL requires the redis package'
+            ) from error
+
+        self._client = redis.from_url(url)
+        self._fenced_set = self._client.register_script(FENCED_SET)
+        self._errors = (redis.RedisError, OSError)
+        self.prefix = prefix
+
+    async def _call(self, method, *args, **kwargs):
+        try:
+            return await method(*args, **kwargs)
+        except self._errors as error:
+            raise CacheBackendError from error
+
+    async def get(self, key):
+        return await self._call(self._client.get, self.prefix + key)
+
+    async def set(self, key, value: bytes, ttl: float):
+        await self._call(
+            self._fenced_set,
+            keys=[self.prefix + key],
+            args=[value, int(ttl * 1000)],
+        )
+
+    async def delete(self, *keys):
+        await self._call(
+            self._client.delete, *(self.prefix + key for key in keys)
+        )
+
+    async def _scan(self):
+        return [key async for key in self._client.scan_iter(self.prefix + '*')]
+
+    async def clear(self):
+        keys = await self._call(self._scan)
+        if keys:
+            await self._call(self._client.delete, *keys)
+
+    @staticmethod
+    def stats():
+        return {'size': None, 'bytes': None}
+
+
+class RecordCache:
+    def __init__(self, backend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key):
+        try:
+            entry = await self.backend.get(key)
+        except CacheBackendError:
+            self.errors += 1
+            entry = None
+
+        value = _payload(entry) if entry is not None else None
+
+        if not value:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return value
+
+    async def set(
+        self, key, value: bytes, fence: int = 0, ttl: float | None = None
+    ):
+        try:
+            await self.backend.set(
+                key, b'%d\n%s' % (fence, value), ttl or self.ttl
+            )
+        except CacheBackendError:
+            self.errors += 1
+
+    async def invalidate(self, *keys, fence: int, ttl: float):
+        for key in keys:
+            await self.set(key, b'', fence, ttl)
+
+    async def delete(self, *keys):
+        if not keys:
+            return
+        try:
+            await self.backend.delete(*keys)
+        except CacheBackendError:
+            self.errors += 1
+
+    async def clear(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        try:
+            await self.backend.clear()
+        except CacheBackendError:
+            self.errors += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            **self.backend.stats(),
+        }
@@ -0,0 +1,190 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+import psycopg
+from sqlalchemy import make_url
+
+from madr.settings import Settings
+from madr.utils import sanitize
+
+PROGRESS_EVERY = 100_000
+NAME_MIN_LENGTH = 3
+NAME_MAX_LENGTH = 256
+YEAR_MIN = -(2**31)
+YEAR_MAX = 2**31 - 1
+
+CREATE_STAGING = """
+    CREATE TEMPORARY TABLE import_books (
+        line bigint NOT NULL,
+        year integer NOT NULL,
+        title text NOT NULL,
+        novelist text NOT NULL
+    ) ON COMMIT DROP
+"""
+
+COPY_STAGING = 'COPY import_books (line, year, title, novelist) FROM STDIN'
+
+MERGE_NOVELISTS = """
+    INSERT INTO novelists (name)
+    SELECT DISTINCT novelist FROM import_books
+    ON CONFLICT (name) DO NOTHING
+"""
+
+MERGE_BOOKS = """
+    WITH merged AS (
+        INSERT INTO books (year, title, novelist_id)
+        SELECT DISTINCT ON (staged.title)
+            staged.year, staged.title, novelists.id
+        FROM import_books AS staged
+        JOIN novelists ON novelists.name = staged.novelist
+        ORDER BY staged.title, staged.line DESC
+        ON CONFLICT (title) DO UPDATE
+        SET
+            year = excluded.year,
+            novelist_id = excluded.novelist_id,
+            updated_at = now()
+        WHERE (books.year, books.novelist_id)
+            IS DISTINCT FROM (excluded.year, excluded.novelist_id)
+        RETURNING xmax = 0 AS inserted
+    )
+    SELECT
+        count(*) FILTER (WHERE inserted),
+        count(*) FILTER (WHERE NOT inserted)
+    FROM merged
+"""
+
+
+def read_records(file, file_format):
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+        return
+
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield {}
+
+
+def parse_year(value):
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+
+    if type(value) is not int or not YEAR_MIN <= value <= YEAR_MAX:
+        return None
+
+    return value
+
+
+def normalize(record):
+    if not isinstance(record, dict):
+        return None
+
+    year = parse_year(record.get('year'))
+    title = record.get('title')
+    novelist = record.get('novelist')
+
+    if year is None or not all(
+        isinstance(name, str) for name in (title, novelist)
+    ):
+        return None
+
+    title, novelist = sanitize(title), sanitize(novelist)
+
+    if not all(
+        NAME_MIN_LENGTH <= len(name) <= NAME_MAX_LENGTH
+        for name in (title, novelist)
+    ):
+        return None
+
+    return year, title, novelist
+
+
+def import_catalog(connection, records, progress=None):
+    read = skipped = 0
+
+    with connection.transaction(), connection.cursor() as cursor:
+        cursor.execute(CREATE_STAGING)
+
+        with cursor.copy(COPY_STAGING) as copy:
+            for read, record in enumerate(records, start=1):
+                row = normalize(record)
+                if row is None:
+                    skipped += 1
+                else:
+                    copy.write_row((read, *row))
+
+                if progress and read % PROGRESS_EVERY == 0:
+                    progress(read)
+
+        cursor.execute('ANALYZE import_books')
+        cursor.execute(MERGE_NOVELISTS)
+        novelists_created = cursor.rowcount
+        books_created, books_updated = cursor.execute(MERGE_BOOKS).fetchone()
+
+    return {
+        'read': read,
+        'skipped': skipped,
+        'novelists_created': novelists_created,
+        'books_created': books_created,
+        'books_updated': books_updated,
+    }
+
+
+def run_import(args):
+    file_format = args.format or (
+        'ndjson' if args.file.name.endswith(('.ndjson', '.jsonl')) else 'csv'
+    )
+    url = make_url(args.database_url).set(drivername='postgresql')
+    started_at = time.perf_counter()
+
+    def progress(read):
+        elapsed = time.perf_counter() - started_at
+        print(
+            f'{read} rows staged ({read / elapsed:.0f} rows/s)',
+            file=sys.stderr,
+        )
+
+    with (
+        args.file,
+        psycopg.connect(url.render_as_string(hide_password=False)) as conn,
+    ):
+        result = import_catalog(
+            conn, read_records(args.file, file_format), progress
+        )
+
+    elapsed = time.perf_counter() - started_at
+    print(
+        f'{result["read"]} rows read, {result["skipped"]} skipped; '
+        f'novelists: {result["novelists_created"]} created; '
+        f'books: {result["books_created"]} created, '
+        f'{result["books_updated"]} updated '
+        f'in {elapsed:.2f}s ({result["read"] / elapsed:.0f} rows/s)'
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='madr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser(
+        'import', help='load books from a CSV or NDJSON file'
+    )
+    importer.add_argument(
+        'file',
+        type=argparse.FileType('r', encoding='utf-8'),
+        help='file with year, title and novelist fields, or - for stdin',
+    )
+    importer.add_argument('--format', choices=['csv', 'ndjson'])
+    importer.add_argument('--database-url')
+    importer.set_defaults(handler=run_import)
+
+    args = parser.parse_args(argv)
+    if args.database_url is None:
+        args.database_url = Settings().DATABASE_URL
+    args.handler(args)
@@ -0,0 +1,85 @@
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+HTTP_DATE_RESOLUTION = timedelta(seconds=1)
+
+
+def is_conditional(request: Request):
+    return (
+        'if-none-match' in request.headers
+        or 'if-modified-since' in request.headers
+    )
+
+
+def make_etag(*parts):
+    digest = blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime):
+    # updated_at columns are naive timestamps written by now() in UTC.
+    return value.replace(tzinfo=value.tzinfo or UTC)
+
+
+def _is_settled(last_modified: datetime):
+    return datetime.now(UTC) - _as_utc(last_modified) > HTTP_DATE_RESOLUTION
+
+
+def _http_date(value: datetime):
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str):
+    if header.strip() == '*':
+        return True
+
+    candidates = {
+        candidate.strip().removeprefix('W/') for candidate in header.split(',')
+    }
+    return etag.removeprefix('W/') in candidates
+
+
+def _modified_since(header: str, last_modified: datetime):
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+
+    last_modified = _as_utc(last_modified).replace(microsecond=0)
+    return since.tzinfo is None or last_modified > since
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if (
+        if_modified_since is not None
+        and last_modified is not None
+        and _is_settled(last_modified)
+    ):
+        return not _modified_since(if_modified_since, last_modified)
+
+    return False
+
+
+def validator_headers(etag: str, last_modified: datetime | None = None):
+    headers = {'ETag': etag}
+    if last_modified is not None and _is_settled(last_modified):
+        headers['Last-Modified'] = _http_date(last_modified)
+    return headers
+
+
+def not_modified_response(etag: str, last_modified: datetime | None = None):
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers=validator_headers(etag, last_modified),
+    )
@@ -1,11 +1,177 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from madr.settings import Settings
 
-engine = create_engine(Settings().DATABASE_URL)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    checkouts = 0
+    timeouts = 0
+    total_wait = 0.0
+    max_wait = 0.0
+
+    def connect(self):
+        start = time.monotonic()
+
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.monotonic() - start
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def stats(self):
+        return {
+            'size': self.size(),
+            'checked_out': self.checkedout(),
+            'idle': self.checkedin(),
+            'overflow': max(self.overflow(), 0),
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'avg_wait_ms': self.total_wait / (self.checkouts or 1) * 1000,
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+def get_engine_options(settings: Settings):
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+
+    if settings.DATABASE_PGBOUNCER:
+        options['connect_args'] = {'prepare_threshold': None}
+
+    return options
+
+
+class ReplicaSet:
+    def __init__(self, engines, retry_after: float):
+        self.engines = engines
+        self.retry_after = retry_after
+        self._down_until = {}
+        self._counter = itertools.count()
+
+    def is_healthy(self, replica):
+        return self._down_until.get(replica, 0) <= time.monotonic()
+
+    def choose(self):
+        healthy = [
+            replica for replica in self.engines if self.is_healthy(replica)
+        ]
+
+        if not healthy:
+            return None
+
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_down(self, replica):
+        self._down_until[replica] = time.monotonic() + self.retry_after
+
+    def mark_up(self, replica):
+        self._down_until.pop(replica, None)
+
+    def handle_error(self, replica, error: exc.DBAPIError):
+        if isinstance(error, exc.InterfaceError) or (
+            error.connection_invalidated
+        ):
+            self.mark_down(replica)
+
+    async def check(self):
+        for replica in self.engines:
+            try:
+                async with replica.connect() as connection:
+                    await connection.execute(text('SELECT 1'))
+            except (exc.DBAPIError, exc.TimeoutError):
+                self.mark_down(replica)
+            else:
+                self.mark_up(replica)
+
+    async def monitor(self, interval: float):  # pragma no cover
+        while True:
+            await self.check()
+            await asyncio.sleep(interval)
+
+    def stats(self):
+        return [
+            {
+                'index': index,
+                'healthy': self.is_healthy(replica),
+                'pool': replica.pool.stats(),
+            }
+            for index, replica in enumerate(self.engines)
+        ]
+
+
+settings = Settings()
+engine = create_async_engine(
+    settings.DATABASE_URL, **get_engine_options(settings)
+)
+replicas = ReplicaSet(
+    [
+        create_async_engine(url, **get_engine_options(settings))
+        for url in settings.DATABASE_REPLICA_URLS
+    ],
+    retry_after=settings.DATABASE_REPLICA_RETRY_SECONDS,
+)
+
+
+async def force_custom_plan(session: AsyncSession):
+    # psycopg prepares repeated statements, and the generic plan Postgres
+    # then caches for `ILIKE $1 ORDER BY id` walks the primary key instead
+    # of the trigram indexes. Planning with the actual pattern avoids that.
+    await session.execute(
+        text('SET LOCAL plan_cache_mode = force_custom_plan')
+    )
+
+
+async def get_session():  # pragma no cover
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+
+
+@asynccontextmanager
+async def read_session(replica_set: ReplicaSet, primary):
+    replica = replica_set.choose()
+
+    if replica:
+        session = AsyncSession(replica, expire_on_commit=False)
+        try:
+            await session.connection()
+        except (
+            exc.OperationalError,
+            exc.InterfaceError,
+            exc.TimeoutError,
+        ):
+            await session.close()
+            replica_set.mark_down(replica)
+        else:
+            async with session:
+                try:
+                    yield session
+                except (exc.OperationalError, exc.InterfaceError) as error:
+                    replica_set.handle_error(replica, error)
+                    raise
+            return
+
+    async with AsyncSession(primary, expire_on_commit=False) as session:
+        yield session
 
 
-def get_session():  # pragma no cover
-    with Session(engine) as session:
+async def get_read_session():  # pragma no cover
+    async with read_session(replicas, engine) as session:
         yield session
@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+from typing import Literal
+
+from fastapi.responses import StreamingResponse
+
+ExportFormat = Literal['ndjson', 'csv']
+
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def _ndjson(rows):
+    return ''.join(
+        json.dumps(row._asdict(), separators=(',', ':')) + '\n' for row in rows
+    )
+
+
+def _csv(rows, header=None):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def _stream(engine, query, export_format, batch_size):
+    snapshot = engine.execution_options(
+        isolation_level='REPEATABLE READ', postgresql_readonly=True
+    )
+
+    async with snapshot.connect() as connection:
+        result = await connection.stream(
+            query.execution_options(yield_per=batch_size)
+        )
+
+        if export_format == 'csv':
+            yield _csv([], header=result.keys())
+
+        async for rows in result.partitions():
+            yield _ndjson(rows) if export_format == 'ndjson' else _csv(rows)
+
+
+def export_response(engine, query, export_format, batch_size):
+    return StreamingResponse(
+        _stream(engine, query, export_format, batch_size),
+        media_type=MEDIA_TYPES[export_format],
+    )
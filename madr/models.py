@@ -1,10 +1,30 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    Computed,
+    ForeignKey,
+    Index,
+    Integer,
+    Table,
+    event,
+    func,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
+SEARCH_CONFIG = 'portuguese'
+
 table_registry = registry()
 
+event.listen(
+    table_registry.metadata,
+    'before_create',
+    DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'),
+)
+
 
 @table_registry.mapped_as_dataclass
 class User:
@@ -25,11 +45,23 @@ class User:
 @table_registry.mapped_as_dataclass
 class Novelist:
     __tablename__ = 'novelists'
+    __table_args__ = (
+        Index(
+            'ix_novelists_name_trgm',
+            'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        ),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
     books: Mapped[list['Book']] = relationship(
-        init=False, back_populates='novelist', cascade='all, delete-orphan'
+        init=False,
+        back_populates='novelist',
+        cascade='all, delete-orphan',
+        passive_deletes=True,
+        lazy='raise',
     )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
@@ -42,13 +74,33 @@ class Novelist:
 @table_registry.mapped_as_dataclass
 class Book:
     __tablename__ = 'books'
+    __table_args__ = (
+        Index(
+            'ix_books_title_trgm',
+            'title',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+        ),
+        Index(
+            'ix_books_search_vector', 'search_vector', postgresql_using='gin'
+        ),
+        Index('ix_books_novelist_id_id', 'novelist_id', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
-    year: Mapped[int] = mapped_column(nullable=False)
+    year: Mapped[int] = mapped_column(nullable=False, index=True)
     title: Mapped[str] = mapped_column(unique=True, nullable=False)
-    novelist_id: Mapped[int] = mapped_column(ForeignKey('novelists.id'))
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}', title)", persisted=True),
+        init=False,
+        deferred=True,
+    )
+    novelist_id: Mapped[int] = mapped_column(
+        ForeignKey('novelists.id', ondelete='CASCADE')
+    )
     novelist: Mapped[Novelist] = relationship(
-        init=False, back_populates='books'
+        init=False, back_populates='books', lazy='raise'
     )
     created_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now()
@@ -56,3 +108,129 @@ class Book:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+
+
+book_year_stats = Table(
+    'book_year_stats',
+    table_registry.metadata,
+    Column('year', Integer, primary_key=True, autoincrement=False),
+    Column('books', BigInteger, nullable=False),
+)
+
+novelist_stats = Table(
+    'novelist_stats',
+    table_registry.metadata,
+    Column(
+        'novelist_id',
+        Integer,
+        ForeignKey('novelists.id', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False,
+    ),
+    Column('books', BigInteger, nullable=False),
+    Column('first_year', Integer),
+    Column('last_year', Integer),
+)
+
+UPDATE_BOOK_STATS = """
+CREATE OR REPLACE FUNCTION update_book_stats() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    added_years integer[];
+    removed_years integer[];
+    novelist_ids integer[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        SELECT array_agg(year), array_agg(novelist_id)
+        INTO added_years, novelist_ids
+        FROM new_rows;
+    ELSIF TG_OP = 'DELETE' THEN
+        SELECT array_agg(year), array_agg(novelist_id)
+        INTO removed_years, novelist_ids
+        FROM old_rows;
+    ELSE
+        SELECT
+            array_agg(new_rows.year),
+            array_agg(old_rows.year),
+            array_agg(new_rows.novelist_id)
+                || array_agg(old_rows.novelist_id)
+        INTO added_years, removed_years, novelist_ids
+        FROM new_rows
+        JOIN old_rows USING (id)
+        WHERE (new_rows.year, new_rows.novelist_id)
+            IS DISTINCT FROM (old_rows.year, old_rows.novelist_id);
+    END IF;
+
+    IF novelist_ids IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO book_year_stats AS stats (year, books)
+    SELECT year, sum(change)
+    FROM (
+        SELECT unnest(added_years) AS year, 1 AS change
+        UNION ALL
+        SELECT unnest(removed_years), -1
+    ) AS changes
+    GROUP BY year
+    HAVING sum(change) <> 0
+    ORDER BY year
+    ON CONFLICT (year) DO UPDATE SET books = stats.books + excluded.books;
+
+    DELETE FROM book_year_stats
+    WHERE year = ANY(removed_years) AND books = 0;
+
+    PERFORM FROM novelists
+    WHERE id = ANY(novelist_ids)
+    ORDER BY id
+    FOR NO KEY UPDATE;
+
+    INSERT INTO novelist_stats AS stats
+        (novelist_id, books, first_year, last_year)
+    SELECT novelists.id, totals.books, totals.first_year, totals.last_year
+    FROM novelists
+    CROSS JOIN LATERAL (
+        SELECT
+            count(*) AS books,
+            min(books.year) AS first_year,
+            max(books.year) AS last_year
+        FROM books
+        WHERE books.novelist_id = novelists.id
+    ) AS totals
+    WHERE novelists.id = ANY(novelist_ids)
+    ORDER BY novelists.id
+    ON CONFLICT (novelist_id) DO UPDATE
+    SET
+        books = excluded.books,
+        first_year = excluded.first_year,
+        last_year = excluded.last_year;
+
+    RETURN NULL;
+END;
+$$
+"""
+
+BOOK_STATS_TRIGGERS = {
+    'INSERT': 'NEW TABLE AS new_rows',
+    'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'OLD TABLE AS old_rows',
+}
+
+event.listen(table_registry.metadata, 'after_create', DDL(UPDATE_BOOK_STATS))
+
+for operation, transition in BOOK_STATS_TRIGGERS.items():
+    event.listen(
+        table_registry.metadata,
+        'after_create',
+        DDL(
+            f'CREATE TRIGGER books_stats_{operation.lower()} '
+            f'AFTER {operation} ON books REFERENCING {transition} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION update_book_stats()'
+        ),
+    )
+
+event.listen(
+    table_registry.metadata,
+    'after_drop',
+    DDL('DROP FUNCTION IF EXISTS update_book_stats()'),
+)
@@ -0,0 +1,109 @@
+from functools import lru_cache
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, create_model
+from sqlalchemy import any_, func, literal, select, text
+from sqlalchemy.dialects.postgresql import ARRAY
+
+ESTIMATED_ROWS = text(
+    'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)'
+)
+
+
+def public_columns(model, schema):
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def select_public(model, schema, *extra_columns):
+    return select(*public_columns(model, schema), *extra_columns)
+
+
+async def fetch_rows(session, query):
+    connection = await session.connection()
+    return (await connection.execute(query)).all()
+
+
+async def fetch_by_ids(session, model, schema, ids: list[int]):
+    ids = list(dict.fromkeys(ids))
+    rows = await fetch_rows(
+        session,
+        select_public(model, schema).where(
+            model.id == any_(literal(ids, ARRAY(model.id.type)))
+        ),
+    )
+    found = {row.id: row for row in rows}
+
+    return (
+        [found[key] for key in ids if key in found],
+        [key for key in ids if key not in found],
+    )
+
+
+async def count_total(session, model, query, filtered: bool, cap: int):
+    if not filtered:
+        estimate = await session.scalar(
+            ESTIMATED_ROWS, {'table': model.__tablename__}
+        )
+        if estimate is not None and estimate >= 0:
+            return estimate, 'estimated'
+
+    rows = (
+        query.with_only_columns(model.id)
+        .order_by(None)
+        .offset(None)
+        .limit(cap + 1)
+        .subquery()
+    )
+    total = await session.scalar(select(func.count()).select_from(rows))
+
+    return (cap, 'capped') if total > cap else (total, 'exact')
+
+
+def total_headers(total: int, kind: str):
+    return {'X-Total-Count': str(total), 'X-Total-Count-Kind': kind}
+
+
+def parse_fields(schema, fields: str | None):
+    if fields is None:
+        return None
+
+    requested = frozenset(
+        field.strip() for field in fields.split(',') if field.strip()
+    )
+    unknown = requested - schema.model_fields.keys()
+
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='Invalid fields, choose from: '
+            + ', '.join(schema.model_fields),
+        )
+
+    return requested
+
+
+def fields_variant(selected: frozenset | None):
+    return (tuple(sorted(selected)),) if selected else ()
+
+
+@lru_cache(maxsize=256)
+def projection(model, schema, fields: frozenset, items: str | None = None):
+    names = [name for name in schema.model_fields if name in fields]
+    columns = dict.fromkeys([*names, 'id', 'updated_at'])
+    item = create_model(
+        f'{schema.__name__}Fields',
+        **{
+            name: (schema.model_fields[name].annotation, ...) for name in names
+        },
+    )
+    adapter = TypeAdapter(
+        create_model(
+            f'{schema.__name__}FieldsList',
+            **{items: (list[item], ...), 'next_cursor': (str | None, None)},
+        )
+        if items
+        else item
+    )
+
+    return select(*(getattr(model, name) for name in columns)), adapter
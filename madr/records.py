@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from fastapi import Request, Response
+
+from madr.cache import MemoryBackend, RecordCache, RedisBackend
+from madr.conditional import (
+    not_modified,
+    not_modified_response,
+    validator_headers,
+)
+from madr.settings import Settings
+
+settings = Settings()
+record_cache = RecordCache(
+    RedisBackend(settings.RECORD_CACHE_URL)
+    if settings.RECORD_CACHE_URL
+    else MemoryBackend(settings.RECORD_CACHE_SIZE),
+    ttl=settings.RECORD_CACHE_TTL_SECONDS,
+)
+EPOCH = datetime(1970, 1, 1)
+DELETED = 2**62
+
+
+def book_key(book_id: int):
+    return f'book:{book_id}'
+
+
+def novelist_key(novelist_id: int):
+    return f'novelist:{novelist_id}'
+
+
+def record_version(updated_at: datetime):
+    return (updated_at.replace(tzinfo=None) - EPOCH) // timedelta(
+        microseconds=1
+    )
+
+
+async def invalidate_records(*keys: str, updated_at: datetime | None = None):
+    await record_cache.invalidate(
+        *keys,
+        fence=record_version(updated_at) if updated_at else DELETED,
+        ttl=settings.RECORD_TOMBSTONE_TTL_SECONDS,
+    )
+
+
+async def store_record(
+    key: str, body: str, etag: str, last_modified: datetime
+):
+    await record_cache.set(
+        key,
+        f'{etag}\n{last_modified.isoformat()}\n{body}'.encode(),
+        fence=record_version(last_modified),
+    )
+
+
+async def cached_record_response(request: Request, key: str):
+    record = await record_cache.get(key)
+
+    if record is None:
+        return None
+
+    etag, last_modified, body = record.decode().split('\n', 2)
+    last_modified = datetime.fromisoformat(last_modified)
+
+    if not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    return Response(
+        body,
+        media_type='application/json',
+        headers=validator_headers(etag, last_modified),
+    )
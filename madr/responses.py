@@ -0,0 +1,12 @@
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+def json_response(adapter: TypeAdapter, content, headers=None):
+    return Response(
+        adapter.dump_json(
+            adapter.validate_python(content, from_attributes=True)
+        ),
+        media_type='application/json',
+        headers=headers,
+    )
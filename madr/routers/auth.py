@@ -4,11 +4,11 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from madr.database import get_session
 from madr.models import User
-from madr.schemas import Token
+from madr.schemas import Token, UserPublic
 from madr.security import (
     create_access_token,
     get_current_user,
@@ -17,14 +17,16 @@ from madr.security import (
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
 
 
 @router.post('/token', status_code=HTTPStatus.OK, response_model=Token)
-def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
-    user = session.scalar(select(User).where(User.email == form_data.username))
+async def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
+    user = await session.scalar(
+        select(User).where(User.email == form_data.username)
+    )
 
     if not user:
         raise HTTPException(
@@ -32,7 +34,7 @@ def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
             detail='Incorrect email or password',
         )
 
-    if not verify_password(form_data.password, user.password):
+    if not await verify_password(form_data.password, user.password):
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Incorrect email or password',
@@ -44,7 +46,7 @@ def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
 
 
 @router.post('/refresh-token', status_code=HTTPStatus.OK, response_model=Token)
-def refresh_access_token(user: T_CurrentUser):
+async def refresh_access_token(user: T_CurrentUser):
     new_access_token = create_access_token(data={'sub': user.email})
 
     return {'access_token': new_access_token, 'token_type': 'Bearer'}
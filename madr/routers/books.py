@@ -1,45 +1,124 @@
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy import select
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from psycopg.errors import ForeignKeyViolation, QueryCanceled
+from pydantic import PositiveInt, TypeAdapter
+from sqlalchemy import (
+    Double,
+    cast,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from madr.database import get_session
-from madr.models import Book, Novelist, User
-from madr.schemas import BookList, BookPublic, BookSchema, BookUpdate, Message
+from madr.conditional import (
+    is_conditional,
+    make_etag,
+    not_modified,
+    not_modified_response,
+    validator_headers,
+)
+from madr.database import (
+    force_custom_plan,
+    get_read_session,
+    get_session,
+    settings,
+)
+from madr.export import ExportFormat, export_response
+from madr.models import SEARCH_CONFIG, Book, Novelist
+from madr.pagination import decode_cursor, encode_cursor
+from madr.queries import (
+    count_total,
+    fetch_by_ids,
+    fetch_rows,
+    fields_variant,
+    parse_fields,
+    projection,
+    public_columns,
+    total_headers,
+)
+from madr.records import (
+    book_key,
+    cached_record_response,
+    invalidate_records,
+    store_record,
+)
+from madr.responses import json_response
+from madr.schemas import (
+    BookBatch,
+    BookBulkResult,
+    BookExpanded,
+    BookExpandedList,
+    BookList,
+    BookPublic,
+    BookSchema,
+    BookUpdate,
+    Message,
+    UserPublic,
+)
 from madr.security import get_current_user
 from madr.utils import sanitize
 
 router = APIRouter(prefix='/books', tags=['books'])
 
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
-T_Session = Annotated[Session, Depends(get_session)]
+T_CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
 
+book_page = TypeAdapter(BookList)
+book_batch = TypeAdapter(BookBatch)
+book_expanded_page = TypeAdapter(BookExpandedList)
 
-@router.post('/', status_code=HTTPStatus.CREATED, response_model=BookPublic)
-def create_book(book: BookSchema, session: T_Session, user: T_CurrentUser):
-    novelist = session.scalar(
-        select(Novelist).where(Novelist.id == book.novelist_id)
-    )
 
-    if not novelist:
+def check_projection(selected, expand):
+    if selected and expand:
         raise HTTPException(
-            status_code=HTTPStatus.NOT_FOUND,
-            detail='Novelist ID not found',
+            status_code=HTTPStatus.BAD_REQUEST,
+            detail='fields cannot be combined with expand',
         )
 
-    new_book = Book(
-        year=book.year, title=sanitize(book.title), novelist_id=novelist.id
-    )
+    return fields_variant(selected)
+
 
+@router.post('/', status_code=HTTPStatus.CREATED, response_model=BookPublic)
+async def create_book(
+    book: BookSchema, session: T_Session, user: T_CurrentUser
+):
     try:
-        session.add(new_book)
-        session.commit()
-        session.refresh(new_book)
-    except IntegrityError:
-        session.rollback()
+        new_book = await session.scalar(
+            insert(Book)
+            .values(
+                year=book.year,
+                title=sanitize(book.title),
+                novelist_id=book.novelist_id,
+            )
+            .returning(Book)
+        )
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        if isinstance(error.orig, ForeignKeyViolation):
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail='Novelist ID not found',
+            )
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Book already exists in MADR',
@@ -48,22 +127,108 @@ def create_book(book: BookSchema, session: T_Session, user: T_CurrentUser):
     return new_book
 
 
+@router.post(
+    '/bulk', status_code=HTTPStatus.MULTI_STATUS, response_model=BookBulkResult
+)
+async def create_books(
+    books: Annotated[
+        list[BookSchema],
+        Body(min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    ],
+    session: T_Session,
+    user: T_CurrentUser,
+):
+    novelist_ids = set(
+        await session.scalars(
+            select(Novelist.id)
+            .where(Novelist.id.in_({book.novelist_id for book in books}))
+            .with_for_update(key_share=True)
+        )
+    )
+
+    errors, rows = [], {}
+    for index, book in enumerate(books):
+        title = sanitize(book.title)
+        if book.novelist_id not in novelist_ids:
+            errors.append({'index': index, 'detail': 'Novelist ID not found'})
+        elif title in rows:
+            errors.append({
+                'index': index,
+                'detail': 'Book already exists in MADR',
+            })
+        else:
+            rows[title] = index
+
+    created_ids = {}
+    if rows:
+        result = await session.execute(
+            pg_insert(Book)
+            .values([
+                {
+                    'year': books[index].year,
+                    'title': title,
+                    'novelist_id': books[index].novelist_id,
+                }
+                for title, index in rows.items()
+            ])
+            .on_conflict_do_nothing(index_elements=['title'])
+            .returning(Book.id, Book.title)
+        )
+        created_ids = {row.title: row.id for row in result}
+    await session.commit()
+
+    created = []
+    for title, index in rows.items():
+        if title in created_ids:
+            created.append({
+                'id': created_ids[title],
+                'year': books[index].year,
+                'title': title,
+                'novelist_id': books[index].novelist_id,
+            })
+        else:
+            errors.append({
+                'index': index,
+                'detail': 'Book already exists in MADR',
+            })
+
+    errors.sort(key=lambda error: error['index'])
+
+    return {'created': created, 'errors': errors}
+
+
+@router.post('/batch-get', status_code=HTTPStatus.OK, response_model=BookBatch)
+async def read_books_by_id(
+    ids: Annotated[
+        list[PositiveInt],
+        Body(min_length=1, max_length=settings.BATCH_GET_MAX_ITEMS),
+    ],
+    session: T_ReadSession,
+    user: T_CurrentUser,
+):
+    books, missing = await fetch_by_ids(session, Book, BookPublic, ids)
+
+    return json_response(book_batch, {'books': books, 'missing': missing})
+
+
 @router.delete('/{book_id}', status_code=HTTPStatus.OK, response_model=Message)
-def delete_book(
+async def delete_book(
     book_id: Annotated[int, Path(gt=0)],
     session: T_Session,
     user: T_CurrentUser,
 ):
-    book = session.scalar(select(Book).where(Book.id == book_id))
+    deleted_id = await session.scalar(
+        delete(Book).where(Book.id == book_id).returning(Book.id)
+    )
 
-    if not book:
+    if not deleted_id:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Book not found in MADR',
         )
 
-    session.delete(book)
-    session.commit()
+    await session.commit()
+    await invalidate_records(book_key(book_id))
 
     return {'message': 'Book deleted from MADR'}
 
@@ -71,13 +236,13 @@ def delete_book(
 @router.patch(
     '/{book_id}', status_code=HTTPStatus.OK, response_model=BookSchema
 )
-def update_book(
+async def update_book(
     book_id: Annotated[int, Path(gt=0)],
     book: BookUpdate,
     session: T_Session,
     user: T_CurrentUser,
 ):
-    book_db = session.scalar(select(Book).where(Book.id == book_id))
+    book_db = await session.scalar(select(Book).where(Book.id == book_id))
 
     if not book_db:
         raise HTTPException(
@@ -91,25 +256,149 @@ def update_book(
         book_db.year = book.year
 
         session.add(book_db)
-        session.commit()
-        session.refresh(book_db)
+        await session.commit()
+        await session.refresh(book_db)
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Book already exists in MADR',
         )
 
+    await invalidate_records(book_key(book_id), updated_at=book_db.updated_at)
+
     return book_db
 
 
-@router.get('/{book_id}', status_code=HTTPStatus.OK, response_model=BookPublic)
-def read_book(
+@router.get('/export', status_code=HTTPStatus.OK)
+async def export_books(
+    session: T_ReadSession,
+    user: T_CurrentUser,
+    format: ExportFormat = 'ndjson',
+):
+    return export_response(
+        session.bind,
+        select(Book.id, Book.year, Book.title, Book.novelist_id).order_by(
+            Book.id
+        ),
+        format,
+        settings.EXPORT_BATCH_SIZE,
+    )
+
+
+@router.get('/search', status_code=HTTPStatus.OK, response_model=BookList)
+async def search_books(
+    session: T_ReadSession,
+    user: T_CurrentUser,
+    q: Annotated[str, Query(min_length=3, max_length=200)],
+    limit: Annotated[int | None, Query(gt=0, le=20)] = 20,
+    cursor: Annotated[str | None, Query(max_length=200)] = None,
+):
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = cast(func.ts_rank(Book.search_vector, ts_query), Double)
+    ranked = (
+        select(Book.id, rank.label('rank'))
+        .where(Book.search_vector.op('@@')(ts_query))
+        .subquery()
+    )
+    query = (
+        select(Book, ranked.c.rank)
+        .join(ranked, Book.id == ranked.c.id)
+        .order_by(ranked.c.rank.desc(), Book.id)
+        .limit(limit)
+    )
+
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, float, int)
+        query = query.filter(
+            or_(
+                ranked.c.rank < last_rank,
+                (ranked.c.rank == last_rank) & (Book.id > last_id),
+            )
+        )
+
+    await session.execute(
+        text(
+            'SET LOCAL statement_timeout = '
+            f'{settings.SEARCH_STATEMENT_TIMEOUT_MS}'
+        )
+    )
+
+    try:
+        rows = (await session.execute(query)).all()
+    except OperationalError as error:
+        if not isinstance(error.orig, QueryCanceled):
+            raise
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Search took too long, try a more specific query',
+        )
+
+    next_cursor = (
+        encode_cursor(rows[-1].rank, rows[-1].Book.id)
+        if len(rows) == limit
+        else None
+    )
+
+    return {'books': [row.Book for row in rows], 'next_cursor': next_cursor}
+
+
+@router.get(
+    '/{book_id}',
+    status_code=HTTPStatus.OK,
+    response_model=BookExpanded | BookPublic,
+)
+async def read_book(  # noqa
     book_id: Annotated[int, Path(gt=0)],
-    session: T_Session,
+    request: Request,
+    response: Response,
+    session: T_ReadSession,
     user: T_CurrentUser,
+    expand: Annotated[Literal['novelist'] | None, Query()] = None,
+    fields: Annotated[str | None, Query(max_length=200)] = None,
 ):
-    book = session.scalar(select(Book).where(Book.id == book_id))
+    selected = parse_fields(BookPublic, fields)
+    variant = check_projection(selected, expand)
+
+    if not expand and not selected:
+        cached = await cached_record_response(request, book_key(book_id))
+        if cached:
+            return cached
+
+    if is_conditional(request):
+        query = select(Book.updated_at).where(Book.id == book_id)
+
+        if expand:
+            query = query.join(Book.novelist).add_columns(Novelist.updated_at)
+
+        versions = (await session.execute(query)).first()
+
+        if versions:
+            etag = make_etag(book_id, *versions, *variant)
+            if not_modified(request, etag, max(versions)):
+                return not_modified_response(etag, max(versions))
+
+    if selected:
+        query, adapter = projection(Book, BookPublic, selected)
+        rows = await fetch_rows(session, query.where(Book.id == book_id))
+
+        if not rows:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail='Book not found in MADR',
+            )
+
+        etag = make_etag(book_id, rows[0].updated_at, *variant)
+        return json_response(
+            adapter, rows[0], validator_headers(etag, rows[0].updated_at)
+        )
+
+    query = select(Book).where(Book.id == book_id)
+
+    if expand:
+        query = query.options(joinedload(Book.novelist, innerjoin=True))
+
+    book = await session.scalar(query)
 
     if not book:
         raise HTTPException(
@@ -117,26 +406,118 @@ def read_book(
             detail='Book not found in MADR',
         )
 
+    versions = (
+        (book.updated_at, book.novelist.updated_at)
+        if expand
+        else (book.updated_at,)
+    )
+    etag = make_etag(book.id, *versions)
+    response.headers.update(validator_headers(etag, max(versions)))
+
+    if not expand:
+        await store_record(
+            book_key(book.id),
+            BookPublic.model_validate(
+                book, from_attributes=True
+            ).model_dump_json(),
+            etag,
+            book.updated_at,
+        )
+
     return book
 
 
-@router.get('/', status_code=HTTPStatus.OK, response_model=BookList)
-def read_books(  # noqa
-    session: T_Session,
+@router.get(
+    '/',
+    status_code=HTTPStatus.OK,
+    response_model=BookList | BookExpandedList,
+)
+async def read_books(  # noqa
+    request: Request,
+    session: T_ReadSession,
     user: T_CurrentUser,
     year: Annotated[int | None, Query(gt=0)] = None,
     title: Annotated[str | None, Query(min_length=3, max_length=200)] = None,
     offset: Annotated[int | None, Query(ge=0)] = 0,
     limit: Annotated[int | None, Query(gt=0, le=20)] = 20,
+    cursor: Annotated[str | None, Query(max_length=200)] = None,
+    expand: Annotated[Literal['novelist'] | None, Query()] = None,
+    fields: Annotated[str | None, Query(max_length=200)] = None,
+    total: Annotated[bool, Query()] = False,
 ):
-    query = select(Book)
+    selected = parse_fields(BookPublic, fields)
+    variant = check_projection(selected, expand)
+    adapter = book_expanded_page if expand else book_page
+    query = select(Book).order_by(Book.id).limit(limit)
+
+    if selected:
+        base, adapter = projection(Book, BookPublic, selected, 'books')
+        query = base.order_by(Book.id).limit(limit)
 
     if year:
         query = query.filter(Book.year == year)
 
     if title:
+        await force_custom_plan(session)
         query = query.filter(Book.title.ilike(f'%{sanitize(title)}%'))
 
-    books = session.scalars(query.offset(offset).limit(limit)).all()
+    headers = {}
+    if total:
+        headers = total_headers(
+            *await count_total(
+                session,
+                Book,
+                query,
+                bool(year or title),
+                settings.TOTAL_COUNT_CAP,
+            )
+        )
+        variant = (*variant, headers['X-Total-Count'])
+
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Book.id > last_id)
+    else:
+        query = query.offset(offset)
+
+    if is_conditional(request):
+        versions_query = query.with_only_columns(Book.id, Book.updated_at)
 
-    return {'books': books}
+        if expand:
+            versions_query = versions_query.join(Book.novelist).add_columns(
+                Novelist.updated_at
+            )
+
+        versions = (await session.execute(versions_query)).tuples()
+        etag = make_etag(limit, *versions, *variant)
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+
+    if expand:
+        books = (
+            await session.scalars(
+                query.options(joinedload(Book.novelist, innerjoin=True))
+            )
+        ).all()
+        versions = [
+            (book.id, book.updated_at, book.novelist.updated_at)
+            for book in books
+        ]
+    else:
+        if not selected:
+            query = query.with_only_columns(
+                *public_columns(Book, BookPublic), Book.updated_at
+            )
+        books = await fetch_rows(session, query)
+        versions = [(book.id, book.updated_at) for book in books]
+
+    next_cursor = encode_cursor(books[-1].id) if len(books) == limit else None
+
+    return json_response(
+        adapter,
+        {'books': books, 'next_cursor': next_cursor},
+        {
+            **validator_headers(make_etag(limit, *versions, *variant)),
+            **headers,
+        },
+    )
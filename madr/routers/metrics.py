@@ -0,0 +1,28 @@
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from madr.database import engine, replicas
+from madr.records import record_cache
+from madr.schemas import Metrics, UserPublic
+from madr.security import (
+    get_current_user,
+    password_hasher,
+    principal_cache,
+)
+
+router = APIRouter(prefix='/metrics', tags=['metrics'])
+
+T_CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
+
+
+@router.get('/', status_code=HTTPStatus.OK, response_model=Metrics)
+async def read_metrics(user: T_CurrentUser):
+    return {
+        'principal_cache': principal_cache.stats(),
+        'record_cache': record_cache.stats(),
+        'password_hasher': password_hasher.stats(),
+        'database_pool': engine.pool.stats(),
+        'replicas': replicas.stats(),
+    }
@@ -1,68 +1,201 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+)
+from pydantic import PositiveInt, TypeAdapter
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from madr.database import get_session
-from madr.models import Novelist, User
-from madr.schemas import Message, NovelistList, NovelistPublic, NovelistSchema
+from madr.conditional import (
+    is_conditional,
+    make_etag,
+    not_modified,
+    not_modified_response,
+    validator_headers,
+)
+from madr.database import (
+    force_custom_plan,
+    get_read_session,
+    get_session,
+    settings,
+)
+from madr.export import ExportFormat, export_response
+from madr.models import Book, Novelist
+from madr.pagination import decode_cursor, encode_cursor
+from madr.queries import (
+    count_total,
+    fetch_by_ids,
+    fetch_rows,
+    fields_variant,
+    parse_fields,
+    projection,
+    select_public,
+    total_headers,
+)
+from madr.records import (
+    book_key,
+    cached_record_response,
+    invalidate_records,
+    novelist_key,
+    store_record,
+)
+from madr.responses import json_response
+from madr.schemas import (
+    BookList,
+    Message,
+    NovelistBatch,
+    NovelistBulkResult,
+    NovelistList,
+    NovelistPublic,
+    NovelistSchema,
+    UserPublic,
+)
 from madr.security import get_current_user
 from madr.utils import sanitize
 
 router = APIRouter(prefix='/novelists', tags=['novelists'])
 
-T_Session = Annotated[Session, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+
+novelist_page = TypeAdapter(NovelistList)
+novelist_batch = TypeAdapter(NovelistBatch)
+T_CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
 
 
 @router.post(
     '/', status_code=HTTPStatus.CREATED, response_model=NovelistPublic
 )
-def create_novelist(
+async def create_novelist(
     novelist: NovelistSchema, session: T_Session, user: T_CurrentUser
 ):
-    novelist_db = session.scalar(
-        select(Novelist).where(Novelist.name == sanitize(novelist.name))
-    )
-
-    if novelist_db:
+    try:
+        db_novelist = await session.scalar(
+            insert(Novelist)
+            .values(name=sanitize(novelist.name))
+            .returning(Novelist)
+        )
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.BAD_REQUEST,
             detail='Novelist already exists.',
         )
 
-    db_novelist = Novelist(name=sanitize(novelist.name))
+    return db_novelist
 
-    session.add(db_novelist)
-    session.commit()
-    session.refresh(db_novelist)
 
-    return db_novelist
+@router.post(
+    '/bulk',
+    status_code=HTTPStatus.MULTI_STATUS,
+    response_model=NovelistBulkResult,
+)
+async def create_novelists(
+    novelists: Annotated[
+        list[NovelistSchema],
+        Body(min_length=1, max_length=settings.BULK_MAX_ITEMS),
+    ],
+    session: T_Session,
+    user: T_CurrentUser,
+):
+    errors, rows = [], {}
+    for index, novelist in enumerate(novelists):
+        name = sanitize(novelist.name)
+        if name in rows:
+            errors.append({
+                'index': index,
+                'detail': 'Novelist already exists.',
+            })
+        else:
+            rows[name] = index
+
+    result = await session.execute(
+        pg_insert(Novelist)
+        .values([{'name': name} for name in rows])
+        .on_conflict_do_nothing(index_elements=['name'])
+        .returning(Novelist.id, Novelist.name)
+    )
+    created_ids = {row.name: row.id for row in result}
+    await session.commit()
+
+    created = []
+    for name, index in rows.items():
+        if name in created_ids:
+            created.append({'id': created_ids[name], 'name': name})
+        else:
+            errors.append({
+                'index': index,
+                'detail': 'Novelist already exists.',
+            })
+
+    errors.sort(key=lambda error: error['index'])
+
+    return {'created': created, 'errors': errors}
+
+
+@router.post(
+    '/batch-get', status_code=HTTPStatus.OK, response_model=NovelistBatch
+)
+async def read_novelists_by_id(
+    ids: Annotated[
+        list[PositiveInt],
+        Body(min_length=1, max_length=settings.BATCH_GET_MAX_ITEMS),
+    ],
+    session: T_ReadSession,
+    user: T_CurrentUser,
+):
+    novelists, missing = await fetch_by_ids(
+        session, Novelist, NovelistPublic, ids
+    )
+
+    return json_response(
+        novelist_batch, {'novelists': novelists, 'missing': missing}
+    )
 
 
 @router.delete(
     '/{novelist_id}', status_code=HTTPStatus.OK, response_model=Message
 )
-def delete_novelist(
+async def delete_novelist(
     novelist_id: Annotated[int, Path(gt=0)],
     session: T_Session,
     user: T_CurrentUser,
 ):
-    novelist_db = session.scalar(
-        select(Novelist).where(Novelist.id == novelist_id)
-    )
+    deleted = (
+        await session.execute(
+            delete(Novelist)
+            .where(Novelist.id == novelist_id)
+            .returning(
+                Novelist.id,
+                select(func.array_agg(Book.id))
+                .where(Book.novelist_id == Novelist.id)
+                .scalar_subquery(),
+            )
+        )
+    ).first()
 
-    if not novelist_db:
+    if not deleted:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND,
             detail='Novelist not found in MADR',
         )
 
-    session.delete(novelist_db)
-    session.commit()
+    await session.commit()
+    await invalidate_records(
+        novelist_key(novelist_id), *map(book_key, deleted[1] or [])
+    )
 
     return {'message': 'Novelist deleted from MADR'}
 
@@ -70,13 +203,13 @@ def delete_novelist(
 @router.patch(
     '/{novelist_id}', status_code=HTTPStatus.OK, response_model=NovelistPublic
 )
-def update_novelist(
+async def update_novelist(
     novelist_id: Annotated[int, Path(gt=0)],
     novelist: NovelistSchema,
     session: T_Session,
     user: T_CurrentUser,
 ):
-    novelist_db = session.scalar(
+    novelist_db = await session.scalar(
         select(Novelist).where(Novelist.id == novelist_id)
     )
 
@@ -88,27 +221,85 @@ def update_novelist(
 
     try:
         novelist_db.name = sanitize(novelist.name)
-        session.commit()
-        session.refresh(novelist_db)
+        await session.commit()
+        await session.refresh(novelist_db)
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Novelist already exists in MADR',
         )
 
+    await invalidate_records(
+        novelist_key(novelist_id), updated_at=novelist_db.updated_at
+    )
+
     return novelist_db
 
 
+@router.get('/export', status_code=HTTPStatus.OK)
+async def export_novelists(
+    session: T_ReadSession,
+    user: T_CurrentUser,
+    format: ExportFormat = 'ndjson',
+):
+    return export_response(
+        session.bind,
+        select(Novelist.id, Novelist.name).order_by(Novelist.id),
+        format,
+        settings.EXPORT_BATCH_SIZE,
+    )
+
+
 @router.get(
     '/{novelist_id}', status_code=HTTPStatus.OK, response_model=NovelistPublic
 )
-def read_novelist(
+async def read_novelist(  # noqa
     novelist_id: Annotated[int, Path(gt=0)],
-    session: T_Session,
+    request: Request,
+    response: Response,
+    session: T_ReadSession,
     user: T_CurrentUser,
+    fields: Annotated[str | None, Query(max_length=200)] = None,
 ):
-    novelist = session.scalar(
+    selected = parse_fields(NovelistPublic, fields)
+    variant = fields_variant(selected)
+
+    if not selected:
+        cached = await cached_record_response(
+            request, novelist_key(novelist_id)
+        )
+        if cached:
+            return cached
+
+    if is_conditional(request):
+        updated_at = await session.scalar(
+            select(Novelist.updated_at).where(Novelist.id == novelist_id)
+        )
+
+        if updated_at:
+            etag = make_etag(novelist_id, updated_at, *variant)
+            if not_modified(request, etag, updated_at):
+                return not_modified_response(etag, updated_at)
+
+    if selected:
+        query, adapter = projection(Novelist, NovelistPublic, selected)
+        rows = await fetch_rows(
+            session, query.where(Novelist.id == novelist_id)
+        )
+
+        if not rows:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail='Novelist not found in MADR',
+            )
+
+        etag = make_etag(novelist_id, rows[0].updated_at, *variant)
+        return json_response(
+            adapter, rows[0], validator_headers(etag, rows[0].updated_at)
+        )
+
+    novelist = await session.scalar(
         select(Novelist).where(Novelist.id == novelist_id)
     )
 
@@ -118,24 +309,123 @@ def read_novelist(
             detail='Novelist not found in MADR',
         )
 
+    etag = make_etag(novelist.id, novelist.updated_at)
+    response.headers.update(validator_headers(etag, novelist.updated_at))
+    await store_record(
+        novelist_key(novelist.id),
+        NovelistPublic.model_validate(
+            novelist, from_attributes=True
+        ).model_dump_json(),
+        etag,
+        novelist.updated_at,
+    )
+
     return novelist
 
 
 @router.get('/', status_code=HTTPStatus.OK, response_model=NovelistList)
-def read_novelists(
-    session: T_Session,
+async def read_novelists(  # noqa
+    request: Request,
+    session: T_ReadSession,
     user: T_CurrentUser,
     name: Annotated[str | None, Query(max_length=200)] = '',
     offset: Annotated[int | None, Query(ge=0)] = 0,
     limit: Annotated[int | None, Query(gt=0, le=10)] = 10,
+    cursor: Annotated[str | None, Query(max_length=200)] = None,
+    fields: Annotated[str | None, Query(max_length=200)] = None,
+    total: Annotated[bool, Query()] = False,
 ):
-    if not name:
-        query = select(Novelist)
+    selected = parse_fields(NovelistPublic, fields)
+    variant = fields_variant(selected)
+    query, adapter = (
+        projection(Novelist, NovelistPublic, selected, 'novelists')
+        if selected
+        else (
+            select_public(Novelist, NovelistPublic, Novelist.updated_at),
+            novelist_page,
+        )
+    )
+    query = query.order_by(Novelist.id).limit(limit)
+
+    if name:
+        await force_custom_plan(session)
+        query = query.filter(Novelist.name.ilike(f'%{sanitize(name)}%'))
+
+    headers = {}
+    if total:
+        headers = total_headers(
+            *await count_total(
+                session,
+                Novelist,
+                query,
+                bool(name),
+                settings.TOTAL_COUNT_CAP,
+            )
+        )
+        variant = (*variant, headers['X-Total-Count'])
+
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Novelist.id > last_id)
     else:
-        query = select(Novelist).filter(
-            Novelist.name.ilike(f'%{sanitize(name)}%')
+        query = query.offset(offset)
+
+    if is_conditional(request):
+        versions = await session.execute(
+            query.with_only_columns(Novelist.id, Novelist.updated_at)
+        )
+        etag = make_etag(limit, *versions.tuples(), *variant)
+        if not_modified(request, etag):
+            return not_modified_response(etag)
+
+    novelists = await fetch_rows(session, query)
+    next_cursor = (
+        encode_cursor(novelists[-1].id) if len(novelists) == limit else None
+    )
+    etag = make_etag(
+        limit,
+        *((novelist.id, novelist.updated_at) for novelist in novelists),
+        *variant,
+    )
+
+    return json_response(
+        adapter,
+        {'novelists': novelists, 'next_cursor': next_cursor},
+        {**validator_headers(etag), **headers},
+    )
+
+
+@router.get(
+    '/{novelist_id}/books', status_code=HTTPStatus.OK, response_model=BookList
+)
+async def read_novelist_books(
+    novelist_id: Annotated[int, Path(gt=0)],
+    session: T_ReadSession,
+    user: T_CurrentUser,
+    limit: Annotated[int | None, Query(gt=0, le=20)] = 20,
+    cursor: Annotated[str | None, Query(max_length=200)] = None,
+):
+    query = (
+        select(Book)
+        .where(Book.novelist_id == novelist_id)
+        .order_by(Book.id)
+        .limit(limit)
+    )
+
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Book.id > last_id)
+
+    books = (await session.scalars(query)).all()
+
+    if not books and not await session.scalar(
+        select(Novelist.id).where(Novelist.id == novelist_id)
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Novelist not found in MADR',
         )
 
-    novelists = session.scalars(query.offset(offset).limit(limit)).all()
+    next_cursor = encode_cursor(books[-1].id) if len(books) == limit else None
 
-    return {'novelists': novelists}
+    return {'books': books, 'next_cursor': next_cursor}
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from madr.database import get_read_session
+from madr.models import Novelist, book_year_stats, novelist_stats
+from madr.pagination import decode_cursor, encode_cursor
+from madr.queries import fetch_rows
+from madr.responses import json_response
+from madr.schemas import BookYearStatsList, NovelistStatsList, UserPublic
+from madr.security import get_current_user
+
+router = APIRouter(prefix='/stats', tags=['stats'])
+
+T_CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
+T_ReadSession = Annotated[AsyncSession, Depends(get_read_session)]
+
+book_year_page = TypeAdapter(BookYearStatsList)
+novelist_stats_page = TypeAdapter(NovelistStatsList)
+
+
+@router.get(
+    '/books-per-year',
+    status_code=HTTPStatus.OK,
+    response_model=BookYearStatsList,
+)
+async def read_books_per_year(session: T_ReadSession, user: T_CurrentUser):
+    years = await fetch_rows(
+        session,
+        select(book_year_stats.c.year, book_year_stats.c.books).order_by(
+            book_year_stats.c.year
+        ),
+    )
+
+    return json_response(book_year_page, {'years': years})
+
+
+@router.get(
+    '/novelists', status_code=HTTPStatus.OK, response_model=NovelistStatsList
+)
+async def read_novelist_stats(
+    session: T_ReadSession,
+    user: T_CurrentUser,
+    limit: Annotated[int | None, Query(gt=0, le=100)] = 100,
+    cursor: Annotated[str | None, Query(max_length=200)] = None,
+):
+    query = (
+        select(
+            Novelist.id.label('novelist_id'),
+            Novelist.name,
+            func.coalesce(novelist_stats.c.books, 0).label('books'),
+            novelist_stats.c.first_year,
+            novelist_stats.c.last_year,
+        )
+        .outerjoin(novelist_stats, novelist_stats.c.novelist_id == Novelist.id)
+        .order_by(Novelist.id)
+        .limit(limit)
+    )
+
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Novelist.id > last_id)
+
+    novelists = await fetch_rows(session, query)
+    next_cursor = (
+        encode_cursor(novelists[-1].novelist_id)
+        if len(novelists) == limit
+        else None
+    )
+
+    return json_response(
+        novelist_stats_page,
+        {'novelists': novelists, 'next_cursor': next_cursor},
+    )
@@ -2,23 +2,33 @@ from http import HTTPStatus
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from madr.database import get_session
 from madr.models import User
+from madr.queries import fetch_rows, select_public
+from madr.responses import json_response
 from madr.schemas import Message, UserList, UserPublic, UserSchema
-from madr.security import get_current_user, get_password_hash
+from madr.security import (
+    get_current_user,
+    get_password_hash,
+    invalidate_principal,
+)
 
 router = APIRouter(prefix='/users', tags=['users'])
 
-T_Session = Annotated[Session, Depends(get_session)]
-T_CurrentUser = Annotated[User, Depends(get_current_user)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
+T_CurrentUser = Annotated[UserPublic, Depends(get_current_user)]
+
+user_page = TypeAdapter(UserList)
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
-def create_user(user: UserSchema, session: T_Session):
-    user_db = session.scalar(
+async def create_user(user: UserSchema, session: T_Session):
+    user_db = await session.scalar(
         select(User).where(
             (User.email == user.email) | (User.username == user.username)
         )
@@ -39,24 +49,26 @@ def create_user(user: UserSchema, session: T_Session):
     db_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await get_password_hash(user.password),
     )
 
     session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
+    await session.commit()
+    await session.refresh(db_user)
 
     return db_user
 
 
 @router.get('/', status_code=HTTPStatus.OK, response_model=UserList)
-def read_users(session: T_Session, skip: int = 0, limit: int = 50):
-    users = session.scalars(select(User).offset(skip).limit(limit)).all()
-    return {'users': users}
+async def read_users(session: T_Session, skip: int = 0, limit: int = 50):
+    users = await fetch_rows(
+        session, select_public(User, UserPublic).offset(skip).limit(limit)
+    )
+    return json_response(user_page, {'users': users})
 
 
 @router.put('/{user_id}', status_code=HTTPStatus.OK, response_model=UserPublic)
-def update_user(
+async def update_user(
     user_id: int,
     user: UserSchema,
     session: T_Session,
@@ -67,34 +79,42 @@ def update_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
 
-    if session.scalar(
-        select(User).where(User.username == user.username, User.id != user_id)
-    ):
-        raise HTTPException(
-            status_code=HTTPStatus.CONFLICT,
-            detail='Username already exists in MADR',
-        )
+    password = await get_password_hash(user.password)
 
-    if session.scalar(
-        select(User).where(User.email == user.email, User.id != user_id)
-    ):
+    try:
+        user_db = await session.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(
+                username=user.username, email=user.email, password=password
+            )
+            .returning(User)
+        )
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        field = (
+            'Username'
+            if 'username' in error.orig.diag.constraint_name
+            else 'Email'
+        )
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
-            detail='Email already exists in MADR',
+            detail=f'{field} already exists in MADR',
         )
 
-    current_user.username = user.username
-    current_user.email = user.email
-    current_user.password = get_password_hash(user.password)
+    invalidate_principal(user_id)
 
-    session.commit()
-    session.refresh(current_user)
+    if user_db is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='User not found in MADR'
+        )
 
-    return current_user
+    return user_db
 
 
 @router.delete('/{user_id}', status_code=HTTPStatus.OK, response_model=Message)
-def delete_user(
+async def delete_user(
     user_id: int,
     session: T_Session,
     current_user: T_CurrentUser,
@@ -104,7 +124,16 @@ def delete_user(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
 
-    session.delete(current_user)
-    session.commit()
+    deleted_id = await session.scalar(
+        delete(User).where(User.id == user_id).returning(User.id)
+    )
+
+    if not deleted_id:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='User not found in MADR'
+        )
+
+    await session.commit()
+    invalidate_principal(user_id)
 
     return {'message': 'Account deleted successfully'}
@@ -41,6 +41,22 @@ class NovelistPublic(NovelistSchema):
 
 class NovelistList(BaseModel):
     novelists: list[NovelistPublic]
+    next_cursor: str | None = None
+
+
+class NovelistBatch(BaseModel):
+    novelists: list[NovelistPublic]
+    missing: list[int]
+
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class NovelistBulkResult(BaseModel):
+    created: list[NovelistPublic]
+    errors: list[BulkItemError]
 
 
 class BookSchema(BaseModel):
@@ -53,6 +69,10 @@ class BookPublic(BookSchema):
     id: int
 
 
+class BookExpanded(BookPublic):
+    novelist: NovelistPublic
+
+
 class BookUpdate(BaseModel):
     year: int | None = None
     title: str | None = Field(min_length=3, max_length=256)
@@ -61,3 +81,95 @@ class BookUpdate(BaseModel):
 
 class BookList(BaseModel):
     books: list[BookPublic]
+    next_cursor: str | None = None
+
+
+class BookExpandedList(BaseModel):
+    books: list[BookExpanded]
+    next_cursor: str | None = None
+
+
+class BookBatch(BaseModel):
+    books: list[BookPublic]
+    missing: list[int]
+
+
+class BookBulkResult(BaseModel):
+    created: list[BookPublic]
+    errors: list[BulkItemError]
+
+
+class BookYearStats(BaseModel):
+    year: int
+    books: int
+
+
+class BookYearStatsList(BaseModel):
+    years: list[BookYearStats]
+
+
+class NovelistStats(BaseModel):
+    novelist_id: int
+    name: str
+    books: int
+    first_year: int | None
+    last_year: int | None
+
+
+class NovelistStatsList(BaseModel):
+    novelists: list[NovelistStats]
+    next_cursor: str | None = None
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+
+
+class RecordCacheStats(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    errors: int
+    hit_ratio: float
+    size: int | None
+    bytes: int | None
+
+
+class WorkerPoolStats(BaseModel):
+    max_workers: int
+    pending: int
+    queue_depth: int
+    completed: int
+    rejected: int
+    expired: int
+    avg_latency_ms: float
+    max_latency_ms: float
+    avg_queue_wait_ms: float
+
+
+class PoolStats(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class ReplicaStats(BaseModel):
+    index: int
+    healthy: bool
+    pool: PoolStats
+
+
+class Metrics(BaseModel):
+    principal_cache: CacheStats
+    record_cache: RecordCacheStats
+    password_hasher: WorkerPoolStats
+    database_pool: PoolStats
+    replicas: list[ReplicaStats]
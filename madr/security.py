@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from http import HTTPStatus
 from typing import Annotated
@@ -8,29 +9,57 @@ from jwt import decode, encode
 from jwt.exceptions import ExpiredSignatureError, PyJWTError
 from pwdlib import PasswordHash
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from zoneinfo import ZoneInfo
 
+from madr.cache import TTLCache
 from madr.database import get_session
 from madr.models import User
-from madr.schemas import TokenData
+from madr.schemas import TokenData, UserPublic
 from madr.settings import Settings
+from madr.workers import BoundedExecutor, ExecutorSaturatedError
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 pwd_context = PasswordHash.recommended()
 settings = Settings()
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE)
+password_hasher = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_session)]
 
 
-def get_password_hash(password: str):
+def _hash(password: str):
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str):
+def _verify(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_password_task(func, *args):
+    try:
+        return await password_hasher.run(func, *args)
+    except ExecutorSaturatedError:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Authentication service is busy, try again later',
+            headers={'Retry-After': '1'},
+        )
+
+
+async def get_password_hash(password: str):
+    return await _run_password_task(_hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str):
+    return await _run_password_task(_verify, plain_password, hashed_password)
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
@@ -43,7 +72,18 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
-def get_current_user(session: T_Session, token: str = Depends(oauth2_scheme)):
+def invalidate_principal(user_id: int):
+    principal_cache.delete_where(lambda principal: principal.id == user_id)
+
+
+async def get_current_user(
+    session: T_Session, token: str = Depends(oauth2_scheme)
+):
+    principal = principal_cache.get(token)
+
+    if principal:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
@@ -63,11 +103,18 @@ def get_current_user(session: T_Session, token: str = Depends(oauth2_scheme)):
     except PyJWTError:
         raise credentials_exception
 
-    user = session.scalar(
+    user = await session.scalar(
         select(User).where(User.email == token_data.username)
     )
 
     if not user:
         raise credentials_exception
 
-    return user
+    principal = UserPublic.model_validate(user)
+    expires_at = min(
+        payload.get('exp', 0),
+        time.time() + settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+    principal_cache.set(token, principal, expires_at=expires_at)
+
+    return principal
@@ -10,3 +10,36 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    PASSWORD_HASH_USE_PROCESSES: bool = False
+
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30.0
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    DATABASE_PGBOUNCER: bool = False
+
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30.0
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 10.0
+
+    SEARCH_STATEMENT_TIMEOUT_MS: int = 2000
+
+    BULK_MAX_ITEMS: int = 1000
+    BATCH_GET_MAX_ITEMS: int = 100
+
+    EXPORT_BATCH_SIZE: int = 1000
+
+    TOTAL_COUNT_CAP: int = 1000
+
+    RECORD_CACHE_SIZE: int = 10_000
+    RECORD_CACHE_TTL_SECONDS: float = 60.0
+    RECORD_TOMBSTONE_TTL_SECONDS: float = 10.0
+    RECORD_CACHE_URL: str | None = None
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ExecutorSaturatedError(Exception):
+    pass
+
+
+def _run_task(func, args, submitted_at, queue_timeout):
+    started_at = time.monotonic()
+
+    if started_at - submitted_at > queue_timeout:
+        raise ExecutorSaturatedError
+
+    return started_at, func(*args)
+
+
+class BoundedExecutor:
+    def __init__(
+        self,
+        max_workers: int,
+        queue_size: int,
+        queue_timeout: float,
+        use_processes: bool = False,
+    ):
+        executor_class = (
+            ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        )
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._executor = executor_class(max_workers=max_workers)
+        self._slots = threading.BoundedSemaphore(max_workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._expired = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+        self._total_queue_wait = 0.0
+
+    def submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorSaturatedError
+
+        with self._lock:
+            self._pending += 1
+
+        future = self._executor.submit(
+            _run_task, func, args, time.monotonic(), self.queue_timeout
+        )
+        future.add_done_callback(self._release)
+
+        return future
+
+    async def _wait(self, future):
+        wrapped = asyncio.wrap_future(future)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(wrapped), self.queue_timeout
+            )
+        except TimeoutError:
+            if future.cancel():
+                raise ExecutorSaturatedError
+            return await wrapped
+
+    async def run(self, func, *args):
+        submitted_at = time.monotonic()
+        future = self.submit(func, *args)
+
+        try:
+            started_at, result = await self._wait(future)
+        except ExecutorSaturatedError:
+            with self._lock:
+                self._expired += 1
+            raise
+
+        finished_at = time.monotonic()
+        with self._lock:
+            self._completed += 1
+            self._total_latency += finished_at - started_at
+            self._max_latency = max(
+                self._max_latency, finished_at - started_at
+            )
+            self._total_queue_wait += started_at - submitted_at
+
+        return result
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            completed = self._completed or 1
+            return {
+                'max_workers': self.max_workers,
+                'pending': self._pending,
+                'queue_depth': max(self._pending - self.max_workers, 0),
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'expired': self._expired,
+                'avg_latency_ms': self._total_latency / completed * 1000,
+                'max_latency_ms': self._max_latency * 1000,
+                'avg_queue_wait_ms': (
+                    self._total_queue_wait / completed * 1000
+                ),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown()
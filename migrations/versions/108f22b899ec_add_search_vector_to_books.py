@@ -0,0 +1,56 @@
+"""add search vector to books
+
+Adding a STORED generated column rewrites books under an ACCESS
+EXCLUSIVE lock, so reads and writes on the table block for the whole
+rewrite, unlike the concurrent index builds elsewhere. Run it in a
+maintenance window on large catalogs. lock_timeout makes the upgrade
+fail fast instead of queueing every request behind a long-running
+transaction while it waits for the lock.
+
+Revision ID: 108f22b899ec
+Revises: 6783c35b125d
+Create Date: 2026-10-18 19:58:12.840263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '108f22b899ec'
+down_revision: Union[str, None] = '6783c35b125d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.add_column('books', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('portuguese', title)", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_search_vector',
+            'books',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_books_search_vector',
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('books', 'search_vector')
@@ -0,0 +1,52 @@
+"""add indexes on books novelist_id and year
+
+Revision ID: 331d87aa193a
+Revises: 108f22b899ec
+Create Date: 2026-10-18 20:21:37.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '331d87aa193a'
+down_revision: Union[str, None] = '108f22b899ec'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_books_novelist_id'),
+            'books',
+            ['novelist_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            op.f('ix_books_year'),
+            'books',
+            ['year'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_books_year'),
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            op.f('ix_books_novelist_id'),
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
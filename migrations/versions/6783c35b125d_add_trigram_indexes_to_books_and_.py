@@ -0,0 +1,57 @@
+"""add trigram indexes to books and novelists
+
+Revision ID: 6783c35b125d
+Revises: cba12017681b
+Create Date: 2026-10-18 19:20:41.503114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6783c35b125d'
+down_revision: Union[str, None] = 'cba12017681b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_title_trgm',
+            'books',
+            ['title'],
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_novelists_name_trgm',
+            'novelists',
+            ['name'],
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_novelists_name_trgm',
+            table_name='novelists',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_books_title_trgm',
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
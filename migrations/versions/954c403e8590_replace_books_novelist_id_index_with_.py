@@ -0,0 +1,52 @@
+"""replace books novelist_id index with novelist_id id
+
+Revision ID: 954c403e8590
+Revises: b7e2d05c91fa
+Create Date: 2026-10-18 19:43:25.239108
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '954c403e8590'
+down_revision: Union[str, None] = 'b7e2d05c91fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_novelist_id_id',
+            'books',
+            ['novelist_id', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            op.f('ix_books_novelist_id'),
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_books_novelist_id'),
+            'books',
+            ['novelist_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_books_novelist_id_id',
+            table_name='books',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
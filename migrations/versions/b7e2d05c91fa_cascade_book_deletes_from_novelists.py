@@ -0,0 +1,47 @@
+"""cascade book deletes from novelists
+
+Revision ID: b7e2d05c91fa
+Revises: 331d87aa193a
+Create Date: 2026-10-18 20:34:02.551970
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d05c91fa'
+down_revision: Union[str, None] = '331d87aa193a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_constraint('books_novelist_id_fkey', 'books', type_='foreignkey')
+    op.create_foreign_key(
+        'books_novelist_id_fkey',
+        'books',
+        'novelists',
+        ['novelist_id'],
+        ['id'],
+        ondelete='CASCADE',
+        postgresql_not_valid=True,
+    )
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE books VALIDATE CONSTRAINT books_novelist_id_fkey')
+
+
+def downgrade() -> None:
+    op.drop_constraint('books_novelist_id_fkey', 'books', type_='foreignkey')
+    op.create_foreign_key(
+        'books_novelist_id_fkey',
+        'books',
+        'novelists',
+        ['novelist_id'],
+        ['id'],
+        postgresql_not_valid=True,
+    )
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE books VALIDATE CONSTRAINT books_novelist_id_fkey')
@@ -0,0 +1,151 @@
+"""create catalog stats summary tables
+
+Revision ID: f9e102960082
+Revises: 954c403e8590
+Create Date: 2026-10-18 20:10:49.560784
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f9e102960082'
+down_revision: Union[str, None] = '954c403e8590'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'book_year_stats',
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('books', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('year'),
+    )
+    op.create_table(
+        'novelist_stats',
+        sa.Column(
+            'novelist_id', sa.Integer(), autoincrement=False, nullable=False
+        ),
+        sa.Column('books', sa.BigInteger(), nullable=False),
+        sa.Column('first_year', sa.Integer(), nullable=True),
+        sa.Column('last_year', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ['novelist_id'], ['novelists.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('novelist_id'),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_book_stats() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            added_years integer[];
+            removed_years integer[];
+            novelist_ids integer[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(year), array_agg(novelist_id)
+                INTO added_years, novelist_ids
+                FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(year), array_agg(novelist_id)
+                INTO removed_years, novelist_ids
+                FROM old_rows;
+            ELSE
+                SELECT
+                    array_agg(new_rows.year),
+                    array_agg(old_rows.year),
+                    array_agg(new_rows.novelist_id)
+                        || array_agg(old_rows.novelist_id)
+                INTO added_years, removed_years, novelist_ids
+                FROM new_rows
+                JOIN old_rows USING (id)
+                WHERE (new_rows.year, new_rows.novelist_id)
+                    IS DISTINCT FROM (old_rows.year, old_rows.novelist_id);
+            END IF;
+
+            IF novelist_ids IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            INSERT INTO book_year_stats AS stats (year, books)
+            SELECT year, sum(change)
+            FROM (
+                SELECT unnest(added_years) AS year, 1 AS change
+                UNION ALL
+                SELECT unnest(removed_years), -1
+            ) AS changes
+            GROUP BY year
+            HAVING sum(change) <> 0
+            ORDER BY year
+            ON CONFLICT (year) DO UPDATE SET books = stats.books + excluded.books;
+
+            DELETE FROM book_year_stats
+            WHERE year = ANY(removed_years) AND books = 0;
+
+            PERFORM FROM novelists
+            WHERE id = ANY(novelist_ids)
+            ORDER BY id
+            FOR NO KEY UPDATE;
+
+            INSERT INTO novelist_stats AS stats
+                (novelist_id, books, first_year, last_year)
+            SELECT novelists.id, totals.books, totals.first_year, totals.last_year
+            FROM novelists
+            CROSS JOIN LATERAL (
+                SELECT
+                    count(*) AS books,
+                    min(books.year) AS first_year,
+                    max(books.year) AS last_year
+                FROM books
+                WHERE books.novelist_id = novelists.id
+            ) AS totals
+            WHERE novelists.id = ANY(novelist_ids)
+            ORDER BY novelists.id
+            ON CONFLICT (novelist_id) DO UPDATE
+            SET
+                books = excluded.books,
+                first_year = excluded.first_year,
+                last_year = excluded.last_year;
+
+            RETURN NULL;
+        END;
+        $$
+        """
+    )
+    for operation, transition in (
+        ('INSERT', 'NEW TABLE AS new_rows'),
+        ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+        ('DELETE', 'OLD TABLE AS old_rows'),
+    ):
+        op.execute(
+            f'CREATE TRIGGER books_stats_{operation.lower()} '
+            f'AFTER {operation} ON books REFERENCING {transition} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION update_book_stats()'
+        )
+    op.execute(
+        """
+        INSERT INTO book_year_stats (year, books)
+        SELECT year, count(*) FROM books GROUP BY year
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO novelist_stats (novelist_id, books, first_year, last_year)
+        SELECT novelist_id, count(*), min(year), max(year)
+        FROM books
+        GROUP BY novelist_id
+        """
+    )
+
+
+def downgrade() -> None:
+    for operation in ('insert', 'update', 'delete'):
+        op.execute(f'DROP TRIGGER IF EXISTS books_stats_{operation} ON books')
+    op.execute('DROP FUNCTION IF EXISTS update_book_stats()')
+    op.drop_table('novelist_stats')
+    op.drop_table('book_year_stats')
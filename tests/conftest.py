@@ -1,14 +1,22 @@
+import asyncio
+
 import factory
+import freezegun
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
 from testcontainers.postgres import PostgresContainer
 
 from madr.app import app
-from madr.database import get_session
+from madr.database import get_read_session, get_session
 from madr.models import Book, Novelist, User, table_registry
-from madr.security import get_password_hash
+from madr.records import record_cache
+from madr.security import principal_cache, pwd_context
+
+freezegun.configure(extend_ignore_list=['asyncio', 'madr.workers'])
 
 
 class UserFactory(factory.Factory):
@@ -37,15 +45,38 @@ class BookFactory(factory.Factory):
 
 
 @pytest.fixture
-def client(session):
-    def get_session_override():
-        return session
+def async_engine(engine):
+    return create_async_engine(engine.url, poolclass=NullPool)
+
+
+@pytest.fixture
+def statements(async_engine):
+    executed = []
+
+    def record(connection, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(async_engine.sync_engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def client(session, async_engine):
+    async def get_session_override():
+        async with AsyncSession(
+            async_engine, expire_on_commit=False
+        ) as async_session:
+            yield async_session
 
     with TestClient(app) as client:
         app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_read_session] = get_session_override
         yield client
 
     app.dependency_overrides.clear()
+    principal_cache.clear()
+    asyncio.run(record_cache.clear())
 
 
 @pytest.fixture(scope='session')
@@ -82,7 +113,7 @@ def token(client, user):
 def user(session):
     password = 'password123'
 
-    user = UserFactory(password=get_password_hash(password))
+    user = UserFactory(password=pwd_context.hash(password))
 
     session.add(user)
     session.commit()
@@ -2,6 +2,9 @@ from http import HTTPStatus
 
 from freezegun import freeze_time
 
+from madr.security import password_hasher
+from madr.workers import ExecutorSaturatedError
+
 
 def test_get_token(client, user):
     response = client.post(
@@ -89,3 +92,20 @@ def test_token_expired_dont_refresh(client, user):
 
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_get_token_when_password_hasher_is_saturated(
+    client, user, monkeypatch
+):
+    async def saturated(func, *args):
+        raise ExecutorSaturatedError
+
+    monkeypatch.setattr(password_hasher, 'run', saturated)
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers['Retry-After'] == '1'
@@ -1,7 +1,24 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import factory
+from fastapi import Request
+from sqlalchemy import text, update
+
+from madr.database import settings
+from madr.models import Book
+from madr.records import (
+    book_key,
+    cached_record_response,
+    record_cache,
+    store_record,
+)
 from tests.conftest import BookFactory
 
+REQUEST = {'type': 'http', 'headers': []}
+
 
 def test_create_book(client, novelist, token):
     response = client.post(
@@ -242,3 +259,618 @@ def test_read_books_should_return_empty_list(client, token):
 
     assert response.status_code == HTTPStatus.OK
     response.json()['books'] == {'books': []}
+
+
+def test_read_books_cursor_pagination_walks_every_book(
+    session, client, token, novelist
+):
+    expected_books = 5
+    session.bulk_save_objects(
+        BookFactory.create_batch(5, novelist_id=novelist.id)
+    )
+    session.commit()
+
+    ids = []
+    url = '/books/?limit=2'
+    while url:
+        response = client.get(
+            url, headers={'Authorization': f'Bearer {token}'}
+        )
+        ids.extend(book['id'] for book in response.json()['books'])
+        next_cursor = response.json()['next_cursor']
+        url = next_cursor and f'/books/?limit=2&cursor={next_cursor}'
+
+    assert len(ids) == expected_books
+    assert ids == sorted(ids)
+
+
+def test_read_books_with_invalid_cursor(client, token):
+    response = client.get(
+        '/books/?cursor=invalid',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor'}
+
+
+def test_search_books_ranks_best_matches_first(
+    session, client, token, novelist
+):
+    session.bulk_save_objects([
+        BookFactory(title='romance de inverno', novelist_id=novelist.id),
+        BookFactory(title='romances e mais romances', novelist_id=novelist.id),
+        BookFactory(title='poemas reunidos', novelist_id=novelist.id),
+    ])
+    session.commit()
+
+    response = client.get(
+        '/books/search?q=romance',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [book['title'] for book in response.json()['books']] == [
+        'romances e mais romances',
+        'romance de inverno',
+    ]
+
+
+def test_search_books_cursor_pagination(session, client, token, novelist):
+    expected_books = 3
+    session.bulk_save_objects(
+        BookFactory.create_batch(
+            3,
+            title=factory.Sequence(lambda n: f'cartas {n}'),
+            novelist_id=novelist.id,
+        )
+    )
+    session.commit()
+
+    ids = []
+    url = '/books/search?q=cartas&limit=2'
+    while url:
+        response = client.get(
+            url, headers={'Authorization': f'Bearer {token}'}
+        )
+        ids.extend(book['id'] for book in response.json()['books'])
+        next_cursor = response.json()['next_cursor']
+        url = next_cursor and (
+            f'/books/search?q=cartas&limit=2&cursor={next_cursor}'
+        )
+
+    assert len(set(ids)) == expected_books
+
+
+def test_search_books_without_matches(client, token):
+    response = client.get(
+        '/books/search?q=nothing',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'books': [], 'next_cursor': None}
+
+
+def test_create_book_issues_a_single_catalog_statement(
+    client, novelist, token, statements
+):
+    client.post(
+        '/books/',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'year': 2024, 'title': 'New Book', 'novelist_id': novelist.id},
+    )
+
+    assert [
+        statement.split()[0]
+        for statement in statements
+        if 'books' in statement or 'novelists' in statement
+    ] == ['INSERT']
+
+
+def test_create_books_in_bulk(client, novelist, token, book, statements):
+    response = client.post(
+        '/books/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[
+            {'year': 2001, 'title': 'First Book', 'novelist_id': novelist.id},
+            {'year': 2002, 'title': book.title, 'novelist_id': novelist.id},
+            {'year': 2003, 'title': 'Orphan Book', 'novelist_id': 999},
+            {'year': 2004, 'title': 'FIRST BOOK!', 'novelist_id': novelist.id},
+            {'year': 2005, 'title': 'Second Book', 'novelist_id': novelist.id},
+        ],
+    )
+
+    assert response.status_code == HTTPStatus.MULTI_STATUS
+    created = response.json()['created']
+    assert [(item['year'], item['title']) for item in created] == [
+        (2001, 'first book'),
+        (2005, 'second book'),
+    ]
+    assert response.json()['errors'] == [
+        {'index': 1, 'detail': 'Book already exists in MADR'},
+        {'index': 2, 'detail': 'Novelist ID not found'},
+        {'index': 3, 'detail': 'Book already exists in MADR'},
+    ]
+    assert [
+        statement.split()[0]
+        for statement in statements
+        if 'INSERT INTO books' in statement
+    ] == ['INSERT']
+
+
+def test_create_books_in_bulk_without_valid_novelists(client, token):
+    response = client.post(
+        '/books/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[{'year': 2001, 'title': 'Book', 'novelist_id': 1}],
+    )
+
+    assert response.status_code == HTTPStatus.MULTI_STATUS
+    assert response.json() == {
+        'created': [],
+        'errors': [{'index': 0, 'detail': 'Novelist ID not found'}],
+    }
+
+
+def test_create_books_in_bulk_rejects_empty_batch(client, token):
+    response = client.post(
+        '/books/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[],
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_export_books_as_ndjson(client, token, session, novelist):
+    books = BookFactory.create_batch(3, novelist_id=novelist.id)
+    session.add_all(books)
+    session.commit()
+
+    response = client.get(
+        '/books/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {
+            'id': book.id,
+            'year': book.year,
+            'title': book.title,
+            'novelist_id': novelist.id,
+        }
+        for book in books
+    ]
+
+
+def test_export_books_as_csv(client, token, book):
+    response = client.get(
+        '/books/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/csv')
+    assert response.text.splitlines() == [
+        'id,year,title,novelist_id',
+        f'{book.id},{book.year},{book.title},{book.novelist_id}',
+    ]
+
+
+def test_read_book_with_expanded_novelist(client, token, book, novelist):
+    response = client.get(
+        f'/books/{book.id}?expand=novelist',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'id': book.id,
+        'year': book.year,
+        'title': book.title,
+        'novelist_id': novelist.id,
+        'novelist': {'id': novelist.id, 'name': novelist.name},
+    }
+
+
+def test_read_books_without_expand_omits_novelist(client, token, book):
+    response = client.get(
+        '/books/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert 'novelist' not in response.json()['books'][0]
+
+
+def test_read_books_with_expanded_novelist(client, token, book, novelist):
+    response = client.get(
+        '/books/?expand=novelist',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.json()['books'][0]['novelist'] == {
+        'id': novelist.id,
+        'name': novelist.name,
+    }
+
+
+def test_read_books_expand_statement_count_is_constant(
+    client, token, session, novelist, statements
+):
+    session.add_all(BookFactory.create_batch(20, novelist_id=novelist.id))
+    session.commit()
+
+    def count_statements(limit):
+        statements.clear()
+        response = client.get(
+            f'/books/?expand=novelist&limit={limit}',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+        assert len(response.json()['books']) == limit
+        return len([
+            statement
+            for statement in statements
+            if 'books' in statement or 'novelists' in statement
+        ])
+
+    assert count_statements(1) == count_statements(20) == 1
+
+
+def test_read_book_sets_validators(client, token, session, book):
+    session.execute(
+        update(Book)
+        .where(Book.id == book.id)
+        .values(updated_at=datetime(2024, 8, 1, 12, 30))
+    )
+    session.commit()
+    response = client.get(
+        f'/books/{book.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.headers['etag'].startswith('W/"')
+    assert response.headers['last-modified'].endswith(' GMT')
+
+
+def test_read_book_not_modified_uses_single_column_lookup(
+    client, token, book, statements
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/books/{book.id}', headers=headers).headers['etag']
+    asyncio.run(record_cache.clear())
+    statements.clear()
+
+    response = client.get(
+        f'/books/{book.id}', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.content == b''
+    assert response.headers['etag'] == etag
+    (lookup,) = [statement for statement in statements if 'books' in statement]
+    assert lookup.startswith('SELECT books.updated_at \nFROM books')
+
+
+def test_read_book_if_modified_since(client, token, session, book):
+    session.execute(
+        update(Book)
+        .where(Book.id == book.id)
+        .values(updated_at=datetime(2024, 8, 1, 12, 30))
+    )
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    last_modified = client.get(f'/books/{book.id}', headers=headers).headers[
+        'last-modified'
+    ]
+
+    response = client.get(
+        f'/books/{book.id}',
+        headers={**headers, 'If-Modified-Since': last_modified},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_read_book_etag_changes_after_update(client, token, book):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/books/{book.id}', headers=headers).headers['etag']
+    expected_year = 1900
+    client.patch(
+        f'/books/{book.id}',
+        headers=headers,
+        json={
+            'year': expected_year,
+            'title': book.title,
+            'novelist_id': book.novelist_id,
+        },
+    )
+
+    response = client.get(
+        f'/books/{book.id}', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['etag'] != etag
+    assert response.json()['year'] == expected_year
+
+
+def test_read_books_not_modified(client, token, book, other_book):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/books/?limit=1', headers=headers).headers['etag']
+
+    not_modified = client.get(
+        '/books/?limit=1', headers={**headers, 'If-None-Match': etag}
+    )
+    other_page = client.get(
+        '/books/?limit=1&offset=1', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+    assert other_page.status_code == HTTPStatus.OK
+
+
+def test_read_book_is_served_from_cache(client, token, book, statements):
+    headers = {'Authorization': f'Bearer {token}'}
+    first = client.get(f'/books/{book.id}', headers=headers)
+    statements.clear()
+
+    second = client.get(f'/books/{book.id}', headers=headers)
+
+    assert second.status_code == HTTPStatus.OK
+    assert second.json() == first.json()
+    assert second.headers['etag'] == first.headers['etag']
+    assert not [statement for statement in statements if 'books' in statement]
+
+
+def test_update_book_invalidates_cache(client, token, book):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get(f'/books/{book.id}', headers=headers)
+
+    client.patch(
+        f'/books/{book.id}',
+        headers=headers,
+        json={
+            'year': book.year,
+            'title': 'Renamed Book',
+            'novelist_id': book.novelist_id,
+        },
+    )
+    response = client.get(f'/books/{book.id}', headers=headers)
+
+    assert response.json()['title'] == 'renamed book'
+
+
+def test_delete_book_invalidates_cache(client, token, book):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get(f'/books/{book.id}', headers=headers)
+
+    client.delete(f'/books/{book.id}', headers=headers)
+    response = client.get(f'/books/{book.id}', headers=headers)
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_stale_read_after_update_is_not_cached(client, token, book):
+    headers = {'Authorization': f'Bearer {token}'}
+    stale = client.get(f'/books/{book.id}', headers=headers)
+
+    client.patch(
+        f'/books/{book.id}',
+        headers=headers,
+        json={
+            'year': book.year,
+            'title': 'Renamed Book',
+            'novelist_id': book.novelist_id,
+        },
+    )
+    asyncio.run(
+        store_record(
+            book_key(book.id),
+            stale.text,
+            stale.headers['etag'],
+            book.updated_at,
+        )
+    )
+    response = client.get(f'/books/{book.id}', headers=headers)
+
+    assert response.json()['title'] == 'renamed book'
+    assert response.headers['etag'] != stale.headers['etag']
+
+
+def test_stale_read_after_delete_is_not_cached(client, token, book):
+    headers = {'Authorization': f'Bearer {token}'}
+    stale = client.get(f'/books/{book.id}', headers=headers)
+
+    client.delete(f'/books/{book.id}', headers=headers)
+    asyncio.run(
+        store_record(
+            book_key(book.id),
+            stale.text,
+            stale.headers['etag'],
+            book.updated_at,
+        )
+    )
+    response = client.get(f'/books/{book.id}', headers=headers)
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_store_record_keeps_newer_version(client, book):
+    older = book.updated_at - timedelta(seconds=1)
+
+    async def scenario():
+        await store_record(book_key(1), '"new"', 'W/"new"', book.updated_at)
+        await store_record(book_key(1), '"old"', 'W/"old"', older)
+        return await cached_record_response(Request(REQUEST), book_key(1))
+
+    assert asyncio.run(scenario()).body == b'"new"'
+
+
+def test_read_books_selects_only_public_columns(
+    client, token, book, statements
+):
+    client.get('/books/', headers={'Authorization': f'Bearer {token}'})
+
+    (query,) = [
+        statement
+        for statement in statements
+        if statement.startswith('SELECT') and 'FROM books' in statement
+    ]
+    assert 'books.title' in query
+    assert 'created_at' not in query
+    assert 'search_vector' not in query
+
+
+def test_read_books_with_fields_selects_only_those_columns(
+    client, token, book, statements
+):
+    response = client.get(
+        '/books/?fields=id,title',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'books': [{'id': book.id, 'title': book.title}],
+        'next_cursor': None,
+    }
+    (query,) = [
+        statement
+        for statement in statements
+        if statement.startswith('SELECT') and 'FROM books' in statement
+    ]
+    assert 'books.year' not in query
+
+
+def test_read_book_with_fields(client, token, book):
+    response = client.get(
+        f'/books/{book.id}?fields=year',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'year': book.year}
+    assert (
+        response.headers['etag']
+        != client.get(
+            f'/books/{book.id}', headers={'Authorization': f'Bearer {token}'}
+        ).headers['etag']
+    )
+
+
+def test_read_books_with_invalid_fields(client, token):
+    response = client.get(
+        '/books/?fields=id,password',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['detail'].startswith('Invalid fields')
+
+
+def test_read_books_fields_with_expand(client, token):
+    response = client.get(
+        '/books/?fields=id&expand=novelist',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {
+        'detail': 'fields cannot be combined with expand'
+    }
+
+
+def test_read_books_by_id(client, token, book, other_book, statements):
+    response = client.post(
+        '/books/batch-get',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[other_book.id, 999, book.id, other_book.id],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert [item['id'] for item in response.json()['books']] == [
+        other_book.id,
+        book.id,
+    ]
+    assert response.json()['missing'] == [999]
+    assert (
+        len([
+            statement for statement in statements if 'FROM books' in statement
+        ])
+        == 1
+    )
+
+
+def test_read_books_by_id_rejects_too_many_ids(client, token):
+    response = client.post(
+        '/books/batch-get',
+        headers={'Authorization': f'Bearer {token}'},
+        json=list(range(1, settings.BATCH_GET_MAX_ITEMS + 2)),
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_read_books_total_uses_estimate_when_unfiltered(
+    client, token, session, novelist
+):
+    expected_total = '5'
+    session.add_all(BookFactory.create_batch(5, novelist_id=novelist.id))
+    session.commit()
+    session.execute(text('ANALYZE books'))
+    session.commit()
+
+    response = client.get(
+        '/books/?total=true&limit=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.headers['x-total-count'] == expected_total
+    assert response.headers['x-total-count-kind'] == 'estimated'
+
+
+def test_read_books_total_is_exact_when_filtered(
+    client, token, session, novelist
+):
+    expected_total = '3'
+    session.add_all(
+        BookFactory.create_batch(3, year=1899, novelist_id=novelist.id)
+    )
+    session.add_all(BookFactory.create_batch(2, novelist_id=novelist.id))
+    session.commit()
+
+    response = client.get(
+        '/books/?total=true&year=1899&limit=1',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['books']) == 1
+    assert response.headers['x-total-count'] == expected_total
+    assert response.headers['x-total-count-kind'] == 'exact'
+
+
+def test_read_books_total_is_capped(
+    client, token, session, novelist, monkeypatch
+):
+    expected_total = '2'
+    monkeypatch.setattr(settings, 'TOTAL_COUNT_CAP', 2)
+    session.add_all(
+        BookFactory.create_batch(3, year=1899, novelist_id=novelist.id)
+    )
+    session.commit()
+
+    response = client.get(
+        '/books/?total=true&year=1899',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.headers['x-total-count'] == expected_total
+    assert response.headers['x-total-count-kind'] == 'capped'
+
+
+def test_read_books_without_total_omits_count(client, token, book):
+    response = client.get(
+        '/books/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert 'x-total-count' not in response.headers
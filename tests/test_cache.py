@@ -0,0 +1,151 @@
+import asyncio
+
+from freezegun import freeze_time
+
+from madr.cache import (
+    CacheBackendError,
+    MemoryBackend,
+    RecordCache,
+    TTLCache,
+)
+
+
+def test_cache_returns_stored_value():
+    cache = TTLCache(maxsize=2)
+    cache.set('key', 'value', expires_at=float('inf'))
+
+    assert cache.get('key') == 'value'
+    assert cache.stats() == {'size': 1, 'maxsize': 2, 'hits': 1, 'misses': 0}
+
+
+def test_cache_counts_misses():
+    cache = TTLCache(maxsize=2)
+
+    assert cache.get('key') is None
+    assert cache.stats()['misses'] == 1
+
+
+def test_cache_expires_entries():
+    cache = TTLCache(maxsize=2)
+
+    with freeze_time('2024-01-01 12:00:00') as frozen:
+        cache.set('key', 'value', expires_at=frozen().timestamp() + 60)
+        assert cache.get('key') == 'value'
+
+        frozen.move_to('2024-01-01 12:01:00')
+        assert cache.get('key') is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1, expires_at=float('inf'))
+    cache.set('b', 2, expires_at=float('inf'))
+    cache.get('a')
+    cache.set('c', 3, expires_at=float('inf'))
+
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3  # noqa: PLR2004
+
+
+def test_cache_delete_where():
+    cache = TTLCache(maxsize=3)
+    cache.set('a', 1, expires_at=float('inf'))
+    cache.set('b', 2, expires_at=float('inf'))
+
+    cache.delete_where(lambda value: value == 1)
+
+    assert cache.get('a') is None
+    assert cache.get('b') == 2  # noqa: PLR2004
+
+
+class FailingBackend:
+    name = 'failing'
+
+    @staticmethod
+    async def get(key):
+        raise CacheBackendError
+
+    @staticmethod
+    async def set(key, value, ttl):
+        raise CacheBackendError
+
+    @staticmethod
+    async def delete(*keys):
+        raise CacheBackendError
+
+    @staticmethod
+    async def clear():
+        raise CacheBackendError
+
+    @staticmethod
+    def stats():
+        return {'size': None, 'bytes': None}
+
+
+def test_record_cache_round_trip():
+    cache = RecordCache(MemoryBackend(maxsize=2), ttl=60)
+
+    async def scenario():
+        await cache.set('book:1', b'payload')
+        first = await cache.get('book:1')
+        await cache.delete('book:1')
+        return first, await cache.get('book:1')
+
+    assert asyncio.run(scenario()) == (b'payload', None)
+    assert cache.stats() == {
+        'backend': 'memory',
+        'hits': 1,
+        'misses': 1,
+        'errors': 0,
+        'hit_ratio': 0.5,
+        'size': 0,
+        'bytes': 0,
+    }
+
+
+def test_record_cache_treats_backend_errors_as_misses():
+    cache = RecordCache(FailingBackend(), ttl=60)
+
+    async def scenario():
+        await cache.set('book:1', b'payload')
+        await cache.delete('book:1')
+        return await cache.get('book:1')
+
+    assert asyncio.run(scenario()) is None
+    assert cache.stats()['errors'] == 3  # noqa: PLR2004
+    assert cache.stats()['misses'] == 1
+
+
+def test_record_cache_counts_clear_errors():
+    cache = RecordCache(FailingBackend(), ttl=60)
+
+    asyncio.run(cache.clear())
+
+    assert cache.stats()['errors'] == 1
+
+
+def test_record_cache_counts_tombstones_as_misses():
+    cache = RecordCache(MemoryBackend(maxsize=2), ttl=60)
+
+    async def scenario():
+        await cache.set('book:1', b'payload', fence=1)
+        await cache.invalidate('book:1', fence=2, ttl=60)
+        return await cache.get('book:1')
+
+    assert asyncio.run(scenario()) is None
+    assert cache.stats()['hits'] == 0
+    assert cache.stats()['misses'] == 1
+    assert cache.stats()['size'] == 0
+    assert cache.stats()['bytes'] == 0
+
+
+def test_record_cache_refuses_older_fence():
+    cache = RecordCache(MemoryBackend(maxsize=2), ttl=60)
+
+    async def scenario():
+        await cache.set('book:1', b'newer', fence=2)
+        await cache.set('book:1', b'older', fence=1)
+        return await cache.get('book:1')
+
+    assert asyncio.run(scenario()) == b'newer'
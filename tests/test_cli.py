@@ -0,0 +1,149 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from madr.cli import import_catalog, main, normalize, read_records
+from madr.models import Book, Novelist, book_year_stats
+
+
+@pytest.fixture
+def database_url(engine):
+    return engine.url.render_as_string(hide_password=False)
+
+
+def test_read_records_from_csv():
+    file = io.StringIO('year,title,novelist\n1899,Dom Casmurro,Machado\n')
+
+    assert list(read_records(file, 'csv')) == [
+        {'year': '1899', 'title': 'Dom Casmurro', 'novelist': 'Machado'}
+    ]
+
+
+def test_read_records_from_ndjson_skips_blank_lines():
+    file = io.StringIO('{"year": 1899}\n\nnot json\n')
+
+    assert list(read_records(file, 'ndjson')) == [{'year': 1899}, {}]
+
+
+def test_normalize_accepts_digit_strings_for_year():
+    assert normalize({
+        'year': ' 1899 ',
+        'title': 'Dom  Casmurro',
+        'novelist': 'Machado',
+    }) == (1899, 'dom casmurro', 'machado')
+
+
+@pytest.mark.parametrize(
+    'record',
+    [
+        {'year': 1899, 'title': 'Dom Casmurro', 'novelist': None},
+        {'year': 1899, 'title': None, 'novelist': 'Machado'},
+        {'year': 1899, 'title': 'Dom Casmurro'},
+        {'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        {'year': None, 'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        {'year': 1899, 'title': ['Dom', 'Casmurro'], 'novelist': 'Machado'},
+        {'year': 1899, 'title': 'Dom Casmurro', 'novelist': {'a': 'b'}},
+        {'year': 1899.7, 'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        {'year': True, 'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        {'year': '-1899', 'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        {'year': 2**31, 'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        {'year': '9' * 12, 'title': 'Dom Casmurro', 'novelist': 'Machado'},
+        ['1899', 'Dom Casmurro', 'Machado'],
+    ],
+)
+def test_normalize_skips_invalid_records(record):
+    assert normalize(record) is None
+
+
+def test_import_catalog_skips_short_csv_rows(session, engine):
+    file = io.StringIO(
+        'year,title,novelist\n1899,Dom Casmurro\n1977,A Hora,Clarice\n'
+    )
+    connection = engine.raw_connection()
+
+    try:
+        result = import_catalog(
+            connection.driver_connection, read_records(file, 'csv')
+        )
+    finally:
+        connection.close()
+
+    assert result['skipped'] == 1
+    assert session.scalars(select(Novelist.name)).all() == ['clarice']
+
+
+def test_import_catalog_merges_books_and_novelists(session, engine, book):
+    records = [
+        {'year': 1899, 'title': 'Dom Casmurro!', 'novelist': 'Machado'},
+        {'year': 1977, 'title': 'A Hora da Estrela', 'novelist': 'Clarice'},
+        {'year': 2024, 'title': book.title, 'novelist': 'Machado'},
+        {'year': 1900, 'title': 'dom  casmurro', 'novelist': 'MACHADO'},
+        {'year': 'unknown', 'title': 'Bad Year', 'novelist': 'Machado'},
+        {'year': 2000, 'title': 'No', 'novelist': 'Machado'},
+    ]
+    connection = engine.raw_connection()
+
+    try:
+        result = import_catalog(connection.driver_connection, records)
+    finally:
+        connection.close()
+
+    assert result == {
+        'read': 6,
+        'skipped': 2,
+        'novelists_created': 2,
+        'books_created': 2,
+        'books_updated': 1,
+    }
+    session.expire_all()
+    assert session.execute(
+        select(Book.title, Book.year, Novelist.name)
+        .join(Novelist)
+        .order_by(Book.title)
+    ).all() == [
+        ('a hora da estrela', 1977, 'clarice'),
+        ('dom casmurro', 1900, 'machado'),
+        (book.title, 2024, 'machado'),
+    ]
+    assert session.execute(
+        select(book_year_stats).order_by(book_year_stats.c.year)
+    ).all() == [(1900, 1), (1977, 1), (2024, 1)]
+
+
+def test_import_catalog_skips_invalid_novelist_names(session, engine):
+    records = [
+        {'year': 1899, 'title': 'Dom Casmurro', 'novelist': 'M'},
+        {'year': 1899, 'title': 'Quincas Borba', 'novelist': 'M' * 257},
+        {'year': 1977, 'title': 'A Hora da Estrela', 'novelist': 'Clarice'},
+    ]
+    connection = engine.raw_connection()
+
+    try:
+        result = import_catalog(connection.driver_connection, records)
+    finally:
+        connection.close()
+
+    assert result['skipped'] == len(records) - 1
+    assert session.scalars(select(Novelist.name)).all() == ['clarice']
+
+
+def test_import_command_reports_throughput(
+    session, database_url, tmp_path, capsys
+):
+    path = tmp_path / 'books.ndjson'
+    path.write_text(
+        json.dumps({
+            'year': 1899,
+            'title': 'Dom Casmurro',
+            'novelist': 'Machado',
+        })
+    )
+
+    main(['import', str(path), '--database-url', database_url])
+
+    output = capsys.readouterr().out
+    assert output.startswith('1 rows read, 0 skipped; novelists: 1 created')
+    assert 'books: 1 created, 0 updated' in output
+    assert output.rstrip().endswith('rows/s)')
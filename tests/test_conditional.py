@@ -0,0 +1,81 @@
+from datetime import UTC, datetime, timedelta
+
+from starlette.requests import Request
+
+from madr.conditional import make_etag, not_modified, validator_headers
+
+LAST_MODIFIED = datetime(2024, 8, 1, 12, 30, 15, 123456)
+
+
+def make_request(**headers):
+    return Request({
+        'type': 'http',
+        'headers': [
+            (name.replace('_', '-').encode(), value.encode())
+            for name, value in headers.items()
+        ],
+    })
+
+
+def test_make_etag_is_weak_and_stable():
+    assert make_etag(1, LAST_MODIFIED) == make_etag(1, LAST_MODIFIED)
+    assert make_etag(1, LAST_MODIFIED) != make_etag(2, LAST_MODIFIED)
+    assert make_etag(1, LAST_MODIFIED).startswith('W/"')
+
+
+def test_validator_headers_use_http_dates():
+    assert validator_headers('W/"x"', LAST_MODIFIED) == {
+        'ETag': 'W/"x"',
+        'Last-Modified': 'Thu, 01 Aug 2024 12:30:15 GMT',
+    }
+
+
+def test_not_modified_matches_weak_and_wildcard_etags():
+    etag = make_etag(1)
+
+    assert not_modified(
+        make_request(if_none_match=etag.removeprefix('W/')), etag
+    )
+    assert not_modified(make_request(if_none_match='*'), etag)
+    assert not not_modified(make_request(if_none_match='"other"'), etag)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = make_request(
+        if_none_match='"other"',
+        if_modified_since='Thu, 01 Aug 2024 12:30:15 GMT',
+    )
+
+    assert not not_modified(request, make_etag(1), LAST_MODIFIED)
+
+
+def test_not_modified_since():
+    etag = make_etag(1)
+
+    assert not_modified(
+        make_request(if_modified_since='Thu, 01 Aug 2024 12:30:15 GMT'),
+        etag,
+        LAST_MODIFIED,
+    )
+    assert not not_modified(
+        make_request(if_modified_since='Thu, 01 Aug 2024 12:30:14 GMT'),
+        etag,
+        LAST_MODIFIED,
+    )
+    assert not not_modified(
+        make_request(if_modified_since='not a date'), etag, LAST_MODIFIED
+    )
+
+
+def test_recent_changes_have_no_last_modified():
+    just_now = datetime.now(UTC).replace(tzinfo=None)
+
+    assert validator_headers('W/"x"', just_now) == {'ETag': 'W/"x"'}
+
+
+def test_if_modified_since_is_ignored_within_date_resolution():
+    just_now = datetime.now(UTC) - timedelta(milliseconds=200)
+    request = make_request(if_modified_since='Sat, 01 Aug 2099 12:30:15 GMT')
+
+    assert not not_modified(request, make_etag(1), just_now)
+    assert not_modified(request, make_etag(1), LAST_MODIFIED)
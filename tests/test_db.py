@@ -1,6 +1,23 @@
-from sqlalchemy import select
+import asyncio
 
-from madr.models import Novelist, User
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import (
+    InterfaceError,
+    InvalidRequestError,
+    OperationalError,
+)
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from madr.database import (
+    InstrumentedQueuePool,
+    ReplicaSet,
+    get_engine_options,
+    read_session,
+)
+from madr.models import Book, Novelist, User
+from madr.settings import Settings
 
 
 def test_create_user(session):
@@ -25,3 +42,198 @@ def test_create_novelist(session):
     )
 
     assert novelist_db.id == 1
+
+
+def test_engine_options_disable_prepared_statements_for_pgbouncer():
+    settings = Settings(DATABASE_PGBOUNCER=True, DATABASE_POOL_SIZE=2)
+
+    options = get_engine_options(settings)
+
+    assert options['pool_size'] == settings.DATABASE_POOL_SIZE
+    assert options['connect_args'] == {'prepare_threshold': None}
+
+
+def test_instrumented_pool_reports_checkouts(engine):
+    async_engine = create_async_engine(
+        engine.url, poolclass=InstrumentedQueuePool, pool_size=1
+    )
+
+    async def run_query():
+        async with async_engine.connect() as connection:
+            await connection.execute(text('SELECT 1'))
+            checked_out = async_engine.pool.stats()['checked_out']
+        await async_engine.dispose()
+        return checked_out
+
+    assert asyncio.run(run_query()) == 1
+
+
+def test_replica_set_round_robins_healthy_replicas():
+    replicas = ReplicaSet(['first', 'second'], retry_after=60)
+
+    assert {replicas.choose(), replicas.choose()} == {'first', 'second'}
+
+
+def test_replica_set_skips_replicas_marked_down():
+    replicas = ReplicaSet(['first', 'second'], retry_after=60)
+
+    replicas.mark_down('first')
+
+    assert {replicas.choose(), replicas.choose()} == {'second'}
+
+
+def test_replica_set_without_healthy_replicas_returns_none():
+    replicas = ReplicaSet(['first'], retry_after=60)
+
+    replicas.mark_down('first')
+
+    assert replicas.choose() is None
+
+
+def test_replica_set_keeps_replica_after_query_error():
+    replicas = ReplicaSet(['first'], retry_after=60)
+
+    replicas.handle_error(
+        'first',
+        OperationalError(
+            'SELECT 1', {}, Exception('conflict with recovery'), False
+        ),
+    )
+
+    assert replicas.is_healthy('first')
+
+
+def test_replica_set_marks_replica_down_after_connection_error():
+    replicas = ReplicaSet(['first', 'second'], retry_after=60)
+
+    replicas.handle_error(
+        'first',
+        OperationalError(
+            'SELECT 1',
+            {},
+            Exception('server closed the connection'),
+            False,
+            connection_invalidated=True,
+        ),
+    )
+    replicas.handle_error(
+        'second', InterfaceError('SELECT 1', {}, Exception('closed'), False)
+    )
+
+    assert not replicas.is_healthy('first')
+    assert not replicas.is_healthy('second')
+
+
+def test_replica_set_check_marks_unreachable_replica_down(engine):
+    reachable = create_async_engine(engine.url, poolclass=NullPool)
+    unreachable = create_async_engine(
+        engine.url.set(port=1), poolclass=NullPool
+    )
+    replicas = ReplicaSet([reachable, unreachable], retry_after=60)
+
+    asyncio.run(replicas.check())
+
+    assert replicas.is_healthy(reachable)
+    assert not replicas.is_healthy(unreachable)
+
+
+def test_read_session_falls_back_to_primary_when_replica_is_down(
+    engine, async_engine
+):
+    unreachable = create_async_engine(
+        engine.url.set(port=1), poolclass=NullPool
+    )
+    replicas = ReplicaSet([unreachable], retry_after=60)
+
+    async def read():
+        async with read_session(replicas, async_engine) as session:
+            return await session.scalar(text('SELECT 1'))
+
+    assert asyncio.run(read()) == 1
+    assert not replicas.is_healthy(unreachable)
+
+
+def test_read_session_uses_healthy_replica(engine, async_engine):
+    replica = create_async_engine(engine.url, poolclass=NullPool)
+    replicas = ReplicaSet([replica], retry_after=60)
+
+    async def read():
+        async with read_session(replicas, async_engine) as session:
+            return session.bind
+
+    assert asyncio.run(read()) is replica
+    assert replicas.is_healthy(replica)
+
+
+def test_replica_set_stats_do_not_expose_urls(engine):
+    replicas = ReplicaSet(
+        [
+            create_async_engine(engine.url, poolclass=InstrumentedQueuePool)
+            for _ in range(2)
+        ],
+        retry_after=60,
+    )
+    replicas.mark_down(replicas.engines[1])
+
+    stats = replicas.stats()
+
+    assert [(replica['index'], replica['healthy']) for replica in stats] == [
+        (0, True),
+        (1, False),
+    ]
+    assert 'url' not in stats[0]
+
+
+def explain(session, query):
+    sql = query.compile(session.bind, compile_kwargs={'literal_binds': True})
+    return '\n'.join(session.scalars(text(f'EXPLAIN {sql}')))
+
+
+def test_title_search_can_use_trigram_index(session):
+    session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    plan = explain(session, select(Book).filter(Book.title.ilike('%book%')))
+
+    assert 'ix_books_title_trgm' in plan
+
+
+def test_name_search_can_use_trigram_index(session):
+    session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    plan = explain(
+        session, select(Novelist).filter(Novelist.name.ilike('%machado%'))
+    )
+
+    assert 'ix_novelists_name_trgm' in plan
+
+
+def test_year_filter_is_index_backed(session):
+    year = 2024
+    session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    plan = explain(session, select(Book).filter(Book.year == year))
+
+    assert 'ix_books_year' in plan
+
+
+def test_novelist_books_lookup_is_index_backed(session):
+    session.execute(text('SET LOCAL enable_seqscan = off'))
+
+    plan = explain(
+        session,
+        select(Book)
+        .filter(Book.novelist_id == 1, Book.id > 1)
+        .order_by(Book.id)
+        .limit(20),
+    )
+
+    assert 'ix_books_novelist_id_id' in plan
+    assert 'Sort' not in plan
+
+
+def test_novelist_books_collection_is_never_lazy_loaded(session, novelist):
+    session.expire_all()
+    loaded = session.scalar(select(Novelist).where(Novelist.id == novelist.id))
+
+    with pytest.raises(InvalidRequestError):
+        loaded.books
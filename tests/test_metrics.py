@@ -0,0 +1,64 @@
+from http import HTTPStatus
+
+
+def test_read_metrics_reports_principal_cache(client, token):
+    expected_hits = 2
+    client.get('/books/', headers={'Authorization': f'Bearer {token}'})
+    client.get('/books/', headers={'Authorization': f'Bearer {token}'})
+
+    response = client.get(
+        '/metrics/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['principal_cache']['misses'] == 1
+    assert response.json()['principal_cache']['hits'] == expected_hits
+
+
+def test_read_metrics_requires_authentication(client):
+    response = client.get('/metrics/')
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_read_metrics_reports_database_pool(client, token):
+    response = client.get(
+        '/metrics/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['database_pool']['checked_out'] == 0
+
+
+def test_read_metrics_reports_record_cache(client, token, book):
+    client.get(
+        f'/books/{book.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+    client.get(
+        f'/books/{book.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    response = client.get(
+        '/metrics/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.json()['record_cache']['backend'] == 'memory'
+    assert response.json()['record_cache']['hit_ratio'] == 0.5  # noqa: PLR2004
+    assert response.json()['record_cache']['size'] == 1
+    assert response.json()['record_cache']['bytes'] > 0
+
+
+def test_read_metrics_counts_tombstones_as_misses(client, token, book):
+    expected_misses = 2
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get(f'/books/{book.id}', headers=headers)
+    client.get(f'/books/{book.id}', headers=headers)
+    client.delete(f'/books/{book.id}', headers=headers)
+    client.get(f'/books/{book.id}', headers=headers)
+
+    response = client.get('/metrics/', headers=headers)
+
+    assert response.json()['record_cache']['hits'] == 1
+    assert response.json()['record_cache']['misses'] == expected_misses
+    assert response.json()['record_cache']['size'] == 0
+    assert response.json()['record_cache']['bytes'] == 0
@@ -1,6 +1,9 @@
 from http import HTTPStatus
 
-from tests.conftest import NovelistFactory
+from sqlalchemy import func, select
+
+from madr.models import Book
+from tests.conftest import BookFactory, NovelistFactory
 
 
 def test_create_novelist(client, token):
@@ -35,6 +38,21 @@ def test_delete_novelist(client, novelist, token):
     assert response.json() == {'message': 'Novelist deleted from MADR'}
 
 
+def test_delete_novelist_cascades_to_books(session, client, novelist, token):
+    session.bulk_save_objects(
+        BookFactory.create_batch(3, novelist_id=novelist.id)
+    )
+    session.commit()
+
+    response = client.delete(
+        f'/novelists/{novelist.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert session.scalar(select(func.count()).select_from(Book)) == 0
+
+
 def test_delete_unexistent_novelist(client, novelist, token):
     response = client.delete(
         f'/novelists/{novelist.id + 1}',
@@ -154,3 +172,224 @@ def test_read_novelists_should_return_empty_list(client, token):
 
     assert response.status_code == HTTPStatus.OK
     response.json()['novelists'] == {'novelists': []}
+
+
+def test_read_novelists_cursor_pagination_returns_next_page(
+    session, client, token
+):
+    session.bulk_save_objects(NovelistFactory.create_batch(3))
+    session.commit()
+
+    first_page = client.get(
+        '/novelists/?limit=2',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()
+    second_page = client.get(
+        f'/novelists/?limit=2&cursor={first_page["next_cursor"]}',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()
+
+    assert len(second_page['novelists']) == 1
+    assert second_page['novelists'][0]['id'] > first_page['novelists'][1]['id']
+    assert second_page['next_cursor'] is None
+
+
+def test_create_novelists_in_bulk(client, token, novelist):
+    response = client.post(
+        '/novelists/bulk',
+        json=[
+            {'name': 'Clarice Lispector'},
+            {'name': novelist.name},
+            {'name': 'CLARICE LISPECTOR!'},
+            {'name': 'Machado de Assis'},
+        ],
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.MULTI_STATUS
+    assert [item['name'] for item in response.json()['created']] == [
+        'clarice lispector',
+        'machado de assis',
+    ]
+    assert response.json()['errors'] == [
+        {'index': 1, 'detail': 'Novelist already exists.'},
+        {'index': 2, 'detail': 'Novelist already exists.'},
+    ]
+
+
+def test_export_novelists(client, token, session):
+    expected_novelists = 5
+    session.add_all(NovelistFactory.create_batch(expected_novelists))
+    session.commit()
+
+    response = client.get(
+        '/novelists/export', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.text.splitlines()) == expected_novelists
+
+
+def test_read_novelist_books_with_cursor(
+    client, token, session, novelist, other_novelist
+):
+    expected_books = 3
+    books = BookFactory.create_batch(5, novelist_id=novelist.id)
+    session.add_all(books)
+    session.add(BookFactory(novelist_id=other_novelist.id))
+    session.commit()
+
+    first_page = client.get(
+        f'/novelists/{novelist.id}/books?limit=2',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()
+    second_page = client.get(
+        f'/novelists/{novelist.id}/books?limit={expected_books}'
+        f'&cursor={first_page["next_cursor"]}',
+        headers={'Authorization': f'Bearer {token}'},
+    ).json()
+
+    assert [book['id'] for book in first_page['books']] == [
+        book.id for book in books[:2]
+    ]
+    assert [book['id'] for book in second_page['books']] == [
+        book.id for book in books[2:]
+    ]
+    assert len(second_page['books']) == expected_books
+
+
+def test_read_novelist_books_empty(client, token, novelist):
+    response = client.get(
+        f'/novelists/{novelist.id}/books',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'books': [], 'next_cursor': None}
+
+
+def test_read_books_of_unexistent_novelist(client, token):
+    response = client.get(
+        '/novelists/1/books', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Novelist not found in MADR'}
+
+
+def test_read_novelist_not_modified(client, token, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get(f'/novelists/{novelist.id}', headers=headers).headers[
+        'etag'
+    ]
+
+    response = client.get(
+        f'/novelists/{novelist.id}',
+        headers={**headers, 'If-None-Match': f'"other", {etag}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_read_novelists_not_modified(client, token, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    etag = client.get('/novelists/', headers=headers).headers['etag']
+
+    response = client.get(
+        '/novelists/', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_update_novelist_invalidates_cache(client, token, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get(f'/novelists/{novelist.id}', headers=headers)
+
+    client.patch(
+        f'/novelists/{novelist.id}',
+        headers=headers,
+        json={'name': 'Machado de Assis'},
+    )
+    response = client.get(f'/novelists/{novelist.id}', headers=headers)
+
+    assert response.json()['name'] == 'machado de assis'
+
+
+def test_delete_novelist_invalidates_its_cached_books(
+    client, token, novelist, book
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get(f'/novelists/{novelist.id}', headers=headers)
+    client.get(f'/books/{book.id}', headers=headers)
+
+    client.delete(f'/novelists/{novelist.id}', headers=headers)
+
+    assert (
+        client.get(f'/novelists/{novelist.id}', headers=headers).status_code
+        == HTTPStatus.NOT_FOUND
+    )
+    assert (
+        client.get(f'/books/{book.id}', headers=headers).status_code
+        == HTTPStatus.NOT_FOUND
+    )
+
+
+def test_read_novelists_with_fields(client, token, novelist):
+    response = client.get(
+        '/novelists/?fields=name',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'novelists': [{'name': novelist.name}],
+        'next_cursor': None,
+    }
+
+
+def test_read_novelist_with_fields(client, token, novelist):
+    response = client.get(
+        f'/novelists/{novelist.id}?fields=id',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'id': novelist.id}
+
+
+def test_read_novelist_with_fields_not_found(client, token):
+    response = client.get(
+        '/novelists/1?fields=id',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_read_novelists_by_id(client, token, novelist):
+    response = client.post(
+        '/novelists/batch-get',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[novelist.id, 999],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'novelists': [{'id': novelist.id, 'name': novelist.name}],
+        'missing': [999],
+    }
+
+
+def test_read_novelists_total_is_exact_when_filtered(client, token, session):
+    expected_total = '5'
+    session.bulk_save_objects(NovelistFactory.create_batch(5))
+    session.commit()
+
+    response = client.get(
+        '/novelists/?name=novelist&total=true&limit=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.headers['x-total-count'] == expected_total
+    assert response.headers['x-total-count-kind'] == 'exact'
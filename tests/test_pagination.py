@@ -0,0 +1,23 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+
+from madr.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(0.5, 42)
+
+    assert decode_cursor(cursor, float, int) == [0.5, 42]
+
+
+@pytest.mark.parametrize(
+    'cursor',
+    ['invalid', encode_cursor('1'), encode_cursor(1, 2), encode_cursor(True)],
+)
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, int)
+
+    assert error.value.status_code == HTTPStatus.BAD_REQUEST
@@ -1,6 +1,6 @@
 from http import HTTPStatus
 
-from madr.security import create_access_token
+from madr.security import create_access_token, principal_cache
 
 
 def test_jwt_invalid_token(client):
@@ -32,3 +32,39 @@ def test_jwt_with_without_sub_claim(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_jwt_principal_is_cached(client, token, user):
+    client.get('/books/', headers={'Authorization': f'Bearer {token}'})
+
+    assert principal_cache.get(token).id == user.id
+
+
+def test_jwt_principal_is_invalidated_on_update(client, token, user):
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'ana',
+            'email': 'ana@test.com',
+            'password': 'password123',
+        },
+    )
+
+    response = client.get(
+        '/books/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_jwt_principal_is_invalidated_on_delete(client, token, user):
+    client.delete(
+        f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    response = client.get(
+        '/books/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,167 @@
+from http import HTTPStatus
+
+from sqlalchemy import delete, func, select, update
+
+from madr.models import Book, book_year_stats, novelist_stats
+from tests.conftest import BookFactory, NovelistFactory
+
+
+def test_books_per_year_reflects_writes(client, token, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    for title, year in (('first', 1899), ('second', 1899), ('third', 1977)):
+        client.post(
+            '/books/',
+            headers=headers,
+            json={'title': title, 'year': year, 'novelist_id': novelist.id},
+        )
+
+    response = client.get('/stats/books-per-year', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'years': [{'year': 1899, 'books': 2}, {'year': 1977, 'books': 1}]
+    }
+
+
+def test_novelist_stats_reflects_writes(client, token, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post(
+        '/books/bulk',
+        headers=headers,
+        json=[
+            {'title': 'first', 'year': 1899, 'novelist_id': novelist.id},
+            {'title': 'second', 'year': 1904, 'novelist_id': novelist.id},
+        ],
+    )
+    other = client.post(
+        '/novelists/', headers=headers, json={'name': 'Clarice'}
+    ).json()
+
+    response = client.get('/stats/novelists', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {
+        'novelists': [
+            {
+                'novelist_id': novelist.id,
+                'name': novelist.name,
+                'books': 2,
+                'first_year': 1899,
+                'last_year': 1904,
+            },
+            {
+                'novelist_id': other['id'],
+                'name': 'clarice',
+                'books': 0,
+                'first_year': None,
+                'last_year': None,
+            },
+        ],
+        'next_cursor': None,
+    }
+
+
+def test_novelist_stats_drops_deleted_novelists(client, token, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.patch(
+        f'/novelists/{novelist.id}', headers=headers, json={'name': 'Machado'}
+    )
+    assert (
+        client.get('/stats/novelists', headers=headers).json()['novelists'][0][
+            'name'
+        ]
+        == 'machado'
+    )
+
+    client.delete(f'/novelists/{novelist.id}', headers=headers)
+
+    assert client.get('/stats/novelists', headers=headers).json() == {
+        'novelists': [],
+        'next_cursor': None,
+    }
+
+
+def test_novelist_stats_pagination(client, token, session):
+    expected_novelists = 2
+    session.bulk_save_objects(NovelistFactory.create_batch(3))
+    session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    client.post('/novelists/', headers=headers, json={'name': 'Clarice'})
+
+    first = client.get('/stats/novelists?limit=2', headers=headers).json()
+    second = client.get(
+        f'/stats/novelists?limit=2&cursor={first["next_cursor"]}',
+        headers=headers,
+    ).json()
+
+    assert len(first['novelists']) == expected_novelists
+    assert len(second['novelists']) == expected_novelists
+    assert second['next_cursor'] is not None
+
+
+def test_stats_follow_book_updates(client, token, session, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    other = client.post(
+        '/novelists/', headers=headers, json={'name': 'Clarice'}
+    ).json()
+    book = client.post(
+        '/books/',
+        headers=headers,
+        json={'title': 'first', 'year': 1899, 'novelist_id': novelist.id},
+    ).json()
+
+    client.patch(
+        f'/books/{book["id"]}',
+        headers=headers,
+        json={'title': 'first', 'year': 1977, 'novelist_id': other['id']},
+    )
+
+    assert session.execute(select(book_year_stats)).all() == [(1977, 1)]
+    assert session.execute(
+        select(novelist_stats).order_by(novelist_stats.c.novelist_id)
+    ).all() == [(novelist.id, 0, None, None), (other['id'], 1, 1977, 1977)]
+
+
+def test_stats_follow_book_deletes(client, token, session, novelist):
+    headers = {'Authorization': f'Bearer {token}'}
+    first = BookFactory(year=1899, novelist_id=novelist.id)
+    session.add_all([first, BookFactory(year=1904, novelist_id=novelist.id)])
+    session.commit()
+
+    client.delete(f'/books/{first.id}', headers=headers)
+
+    assert session.execute(select(book_year_stats)).all() == [(1904, 1)]
+    assert session.execute(select(novelist_stats)).all() == [
+        (novelist.id, 1, 1904, 1904)
+    ]
+
+
+def test_stats_drop_cascaded_books(session, novelist):
+    session.add_all(BookFactory.create_batch(3, novelist_id=novelist.id))
+    session.commit()
+
+    session.delete(novelist)
+    session.commit()
+
+    assert session.execute(select(book_year_stats)).all() == []
+    assert session.execute(select(novelist_stats)).all() == []
+
+
+def test_stats_match_a_full_recount_after_bulk_writes(session, novelist):
+    session.add_all(BookFactory.create_batch(50, novelist_id=novelist.id))
+    session.commit()
+    session.execute(update(Book).where(Book.id % 3 == 0).values(year=2000))
+    session.execute(delete(Book).where(Book.id % 5 == 0))
+    session.commit()
+
+    assert sorted(session.execute(select(book_year_stats)).all()) == sorted(
+        session.execute(
+            select(Book.year, func.count()).group_by(Book.year)
+        ).all()
+    )
+    assert session.execute(
+        select(novelist_stats.c.books, novelist_stats.c.last_year)
+    ).one() == (
+        session.scalar(select(func.count(Book.id))),
+        session.scalar(select(func.max(Book.year))),
+    )
@@ -148,3 +148,61 @@ def test_delete_user_with_wrong_user(client, other_user, token):
 
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+def test_update_user_issues_a_single_write(client, user, token, statements):
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'ana',
+            'email': 'ana@test.com',
+            'password': 'password123',
+        },
+    )
+
+    assert [statement.split()[0] for statement in statements] == [
+        'SELECT',
+        'UPDATE',
+    ]
+
+
+def test_delete_user_already_removed(client, session, user, token):
+    client.get('/books/', headers={'Authorization': f'Bearer {token}'})
+    session.delete(user)
+    session.commit()
+
+    response = client.delete(
+        f'/users/{user.id}', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'User not found in MADR'}
+
+
+def test_update_user_already_removed(client, session, user, token):
+    client.get('/books/', headers={'Authorization': f'Bearer {token}'})
+    session.delete(user)
+    session.commit()
+
+    response = client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': 'bob',
+            'email': 'bob@example.com',
+            'password': 'mynewpassword',
+        },
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'User not found in MADR'}
+
+
+def test_read_users_selects_only_public_columns(client, user, statements):
+    client.get('/users/')
+
+    (query,) = [
+        statement for statement in statements if 'FROM users' in statement
+    ]
+    assert 'users.password' not in query
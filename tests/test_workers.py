@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from madr.workers import BoundedExecutor, ExecutorSaturatedError
+
+
+def test_bounded_executor_runs_task():
+    executor = BoundedExecutor(max_workers=1, queue_size=1, queue_timeout=5)
+
+    assert asyncio.run(executor.run(sum, [1, 2])) == 3  # noqa: PLR2004
+    assert executor.stats()['completed'] == 1
+
+
+def test_bounded_executor_rejects_when_queue_is_full():
+    executor = BoundedExecutor(max_workers=1, queue_size=0, queue_timeout=5)
+    release = threading.Event()
+    executor.submit(release.wait)
+
+    with pytest.raises(ExecutorSaturatedError):
+        executor.submit(sum, [1, 2])
+
+    release.set()
+    assert executor.stats()['rejected'] == 1
+
+
+def test_bounded_executor_expires_tasks_waiting_too_long():
+    executor = BoundedExecutor(max_workers=1, queue_size=1, queue_timeout=0)
+    release = threading.Event()
+    executor.submit(release.wait)
+    future = executor.submit(sum, [1, 2])
+    release.set()
+
+    with pytest.raises(ExecutorSaturatedError):
+        future.result()
+
+
+def test_bounded_executor_run_gives_up_at_queue_deadline():
+    max_wait = 0.5
+    executor = BoundedExecutor(max_workers=1, queue_size=1, queue_timeout=0.1)
+    release = threading.Event()
+    executor.submit(release.wait, 1)
+
+    started_at = time.monotonic()
+    with pytest.raises(ExecutorSaturatedError):
+        asyncio.run(executor.run(sum, [1, 2]))
+    waited = time.monotonic() - started_at
+    release.set()
+
+    assert waited < max_wait
+    assert executor.stats()['expired'] == 1
+    assert executor.stats()['pending'] == 1
+
+
+def test_bounded_executor_run_waits_for_started_tasks():
+    executor = BoundedExecutor(max_workers=1, queue_size=1, queue_timeout=0.05)
+
+    assert asyncio.run(executor.run(time.sleep, 0.2)) is None
+    assert executor.stats()['completed'] == 1